@@ -1,19 +1,123 @@
-from .loading import Load_Model, Load_Vectorizer
+from .cache import TTLCache
+from . import artifacts
+from .registry import ModelRegistry
 import os
+import re
+import threading
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-model_path = os.path.join(BASE_DIR, "model", "model.pkl")
-vectorizer_path = os.path.join(BASE_DIR, "model", "vectorizer.pkl")
+# tfidf: vocabulary-based TfidfVectorizer (model/)
+# hashed: HashingVectorizer + IDF, no vocabulary (model/hashed/, from train.py)
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "tfidf")
+if MODEL_VARIANT not in artifacts.MODEL_DIRS:
+    raise ValueError(f"MODEL_VARIANT must be one of {sorted(artifacts.MODEL_DIRS)}")
+# any directory laid out like model/ (e.g. a volume shared by several hosts)
+MODEL_DIR = os.getenv("MODEL_DIR") or artifacts.MODEL_DIRS[MODEL_VARIANT]
+# serve this version from MODEL_DIR/versions/ instead of the newest one
+MODEL_VERSION = os.getenv("MODEL_VERSION", "")
+
+# Prediction cache settings
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "10000"))
+PREDICT_CACHE_TTL = int(os.getenv("PREDICT_CACHE_TTL", "3600"))
+# How often (seconds) to look for a new model version; 0 disables hot reload
+ARTIFACT_CHECK_INTERVAL = float(os.getenv("ARTIFACT_CHECK_INTERVAL", "5"))
+
+# pickle: joblib .pkl files, copied into every process
+# mmap:   memory-mapped arrays (python -m ai_intratation.artifacts), shared
+#         between all workers on the host through the page cache
+# auto:   mmap when the version has an mmap/ directory exported from its
+#         current .pkl files, otherwise pickle
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "auto")
+MODEL_MMAP_DIR = os.getenv("MODEL_MMAP_DIR")
+
+prediction_cache = TTLCache(PREDICT_CACHE_SIZE, PREDICT_CACHE_TTL)
+
+
+def _on_swap(old, new):
+    # entries are keyed by generation, so this only frees the old ones
+    if old is not None:
+        prediction_cache.clear()
+
+
+# Loaded on first use or by warm_up(), not at import: unpickling pulls in
+# scikit-learn, which is most of the API's startup time (the mmap format
+# does not need it).
+registry = ModelRegistry(
+    MODEL_DIR, MODEL_FORMAT, MODEL_MMAP_DIR, MODEL_VERSION, ARTIFACT_CHECK_INTERVAL, _on_swap,
+)
+
+
+def load_artifacts():
+    """Load the model and vectorizer once; later calls return immediately."""
+    return registry.load()
+
+
+def _warm_up():
+    try:
+        load_artifacts()
+    except Exception as e:
+        print(f"[WARN] Model warm-up failed: {e}")
+
+
+def warm_up():
+    """
+    Start loading the model in the background so startup does not wait for
+    it, and start watching for new versions in this process.
+    """
+    threading.Thread(target=_warm_up, name="model-warm-up", daemon=True).start()
+    registry.start_watching()
+
+
+def is_ready() -> bool:
+    return registry.is_ready()
+
+
+def model_info() -> dict:
+    return registry.stats()
+
+
+def normalize_key(text: str) -> str:
+    return re.sub(r"\s+", " ", text.strip().lower())
 
-model = Load_Model(model_path)
-vectorizer = Load_Vectorizer(vectorizer_path)
 
 def predict_text(text: str) -> dict:
-    X = vectorizer.transform([text])
-    prediction = model.predict(X)[0]  # extract the single result
+    active = load_artifacts()  # one version for the whole request, even across a swap
+
+    key = (active.generation, normalize_key(text))
+    prediction = prediction_cache.get(key)
+
+    if prediction is None:
+        X = active.vectorizer.transform([text])
+        prediction = active.model.predict(X)[0]  # extract the single result
+        prediction_cache.put(key, prediction)
 
     return {
         "input": text,
         "prediction": prediction
-    }
\ No newline at end of file
+    }
+
+
+def predict_batch(texts: list) -> list:
+    """Categorize many texts with one transform and one predict_proba call."""
+    if not texts:
+        return []
+
+    active = load_artifacts()
+
+    X = active.vectorizer.transform(texts)  # one sparse matrix for the whole batch
+    proba = active.model.predict_proba(X)
+    best = proba.argmax(axis=1)
+
+    return [
+        {
+            "input": text,
+            "prediction": str(active.model.classes_[best[row]]),
+            "confidence": float(proba[row, best[row]])
+        }
+        for row, text in enumerate(texts)
+    ]
+
+
+def cache_stats() -> dict:
+    return prediction_cache.stats()
@@ -0,0 +1,331 @@
+"""
+Memory-mapped model artifacts.
+
+The joblib pickles are unpickled into every API worker's heap. This format
+stores the numeric arrays as .npy files opened with mmap_mode="r", so all
+workers on a host read the same page-cache copy:
+
+    feature_log_prob.npy   (n_features, n_classes) float64, row per feature
+    class_log_prior.npy    (n_classes,)
+    idf.npy                (n_features,)
+    vocab_terms.npy        sorted fixed-width UTF-8 terms ("S<n>")
+    vocab_index.npy        feature column of each sorted term
+    meta.json              classes, tokenizer settings, stop words,
+                           sha256 of the .pkl files it was exported from
+
+Weights are stored feature-major so a request only touches the pages of
+the n-grams it contains. Serving needs numpy and scipy, not scikit-learn.
+A hashed model (HashingVectorizer + TfidfTransformer, see train.py) has
+no vocabulary files: n-grams are hashed to their column at request time.
+
+    python -m ai_intratation.artifacts            # convert model/*.pkl -> model/mmap/
+"""
+from collections import Counter
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# where each vectorizer variant is trained to and served from (MODEL_VARIANT)
+MODEL_DIRS = {
+    "tfidf": os.path.join(BASE_DIR, "model"),
+    "hashed": os.path.join(BASE_DIR, "model", "hashed"),
+}
+DEFAULT_DIR = os.path.join(MODEL_DIRS["tfidf"], "mmap")
+VERSIONS_DIR = "versions"  # train.py writes <model dir>/versions/<version>/
+FORMAT_VERSION = 2  # 2: adds hashed vectorizers
+SUPPORTED_VERSIONS = (1, 2)
+META_FILE = "meta.json"
+SOURCE_FILES = ("model.pkl", "vectorizer.pkl")
+
+
+def murmurhash3_32(data: bytes, seed=0) -> int:
+    """Signed MurmurHash3 (x86, 32 bit), as used by sklearn's HashingVectorizer."""
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+    h = seed
+    end = len(data) - len(data) % 4
+    for i in range(0, end, 4):
+        k = int.from_bytes(data[i:i + 4], "little")
+        k = (k * c1) & 0xffffffff
+        k = ((k << 15) | (k >> 17)) & 0xffffffff
+        h ^= (k * c2) & 0xffffffff
+        h = ((h << 13) | (h >> 19)) & 0xffffffff
+        h = (h * 5 + 0xe6546b64) & 0xffffffff
+
+    k = 0
+    tail = data[end:]
+    if len(tail) == 3:
+        k ^= tail[2] << 16
+    if len(tail) >= 2:
+        k ^= tail[1] << 8
+    if tail:
+        k ^= tail[0]
+        k = (k * c1) & 0xffffffff
+        k = ((k << 15) | (k >> 17)) & 0xffffffff
+        h ^= (k * c2) & 0xffffffff
+
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & 0xffffffff
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & 0xffffffff
+    h ^= h >> 16
+    return h - 0x100000000 if h & 0x80000000 else h
+
+
+# ---------------- EXPORT ----------------
+def _save_npy(directory, name, array):
+    # write then rename: workers that still map the old file keep its inode
+    path = os.path.join(directory, name)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp, path)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def export_artifacts(model, vectorizer, out_dir=DEFAULT_DIR, source_dir=None):
+    """
+    Write a fitted MultinomialNB plus either a TfidfVectorizer or a
+    HashingVectorizer + TfidfTransformer pipeline in the mapped format.
+    source_dir holds the .pkl files they were saved to; their hashes are
+    recorded so a later change to the pickles can be detected.
+    """
+    hashed = hasattr(vectorizer, "steps")
+    # the pipeline splits tokenizing (step 0) and weighting (step 1)
+    text, weighting = (vectorizer.steps[0][1], vectorizer.steps[1][1]) if hashed \
+        else (vectorizer, vectorizer)
+
+    if text.analyzer != "word" or text.tokenizer or text.preprocessor:
+        raise ValueError("Only word analyzers with the default tokenizer can be exported")
+    if text.strip_accents:
+        raise ValueError("strip_accents is not supported by the mapped format")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    _save_npy(out_dir, "feature_log_prob.npy", model.feature_log_prob_.T)
+    _save_npy(out_dir, "class_log_prior.npy", model.class_log_prior_)
+    _save_npy(out_dir, "idf.npy", weighting.idf_)
+
+    if hashed:
+        n_features = text.n_features
+    else:
+        terms = sorted(vectorizer.vocabulary_)
+        encoded = [term.encode("utf-8") for term in terms]
+        width = max(len(term) for term in encoded)
+        _save_npy(out_dir, "vocab_terms.npy", np.array(encoded, dtype=f"S{width}"))
+        _save_npy(out_dir, "vocab_index.npy",
+                  np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int64))
+        n_features = len(terms)
+
+    stop_words = text.get_stop_words()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "vectorizer": "hashing" if hashed else "vocabulary",
+        "classes": [str(c) for c in model.classes_],
+        "n_features": n_features,
+        "alternate_sign": bool(getattr(text, "alternate_sign", False)),
+        "lowercase": text.lowercase,
+        "token_pattern": text.token_pattern,
+        "ngram_range": list(text.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else [],
+        "norm": weighting.norm,
+        "use_idf": weighting.use_idf,
+        "sublinear_tf": weighting.sublinear_tf,
+        "binary": text.binary,
+    }
+    if source_dir:
+        meta["sources"] = {name: _sha256(os.path.join(source_dir, name)) for name in SOURCE_FILES}
+    # meta.json last: its change is what running workers watch for
+    tmp = os.path.join(out_dir, META_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(out_dir, META_FILE))
+    return out_dir
+
+
+# ---------------- SERVING ----------------
+class MappedVectorizer:
+    """TF-IDF transform over a memory-mapped vocabulary (or n-gram hashing) and idf."""
+
+    def __init__(self, directory, meta):
+        self.hashing = meta.get("vectorizer", "vocabulary") == "hashing"
+        if not self.hashing:
+            self.terms = np.load(os.path.join(directory, "vocab_terms.npy"), mmap_mode="r")
+            self.term_index = np.load(os.path.join(directory, "vocab_index.npy"), mmap_mode="r")
+            self.width = self.terms.dtype.itemsize
+        self.idf_ = np.load(os.path.join(directory, "idf.npy"), mmap_mode="r")
+        self.n_features = meta["n_features"]
+        self.alternate_sign = meta.get("alternate_sign", False)
+
+        self.lowercase = meta["lowercase"]
+        self.token_pattern = re.compile(meta["token_pattern"])
+        self.min_n, self.max_n = meta["ngram_range"]
+        self.stop_words = frozenset(meta["stop_words"])
+        self.norm = meta["norm"]
+        self.use_idf = meta["use_idf"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.binary = meta["binary"]
+
+    def _analyze(self, text):
+        if self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_pattern.findall(text) if t not in self.stop_words]
+        ngrams = []
+        for n in range(self.min_n, self.max_n + 1):
+            for i in range(len(tokens) - n + 1):
+                ngrams.append(" ".join(tokens[i:i + n]))
+        return ngrams
+
+    def _hash(self, counts):
+        """Column index per n-gram, same as HashingVectorizer (colliding n-grams add up)."""
+        columns = {}
+        for term, count in counts.items():
+            h = murmurhash3_32(term.encode("utf-8"))
+            # abs(-2**31) overflows in sklearn's int32 code; this matches its result
+            col = (2147483647 - (self.n_features - 1)) % self.n_features \
+                if h == -2147483648 else abs(h) % self.n_features
+            if self.alternate_sign and h < 0:
+                count = -count
+            columns[col] = columns.get(col, 0) + count
+        return list(columns), list(columns.values())
+
+    def _lookup(self, counts):
+        """Column index for each known n-gram in counts (unknown ones dropped)."""
+        if self.hashing:
+            return self._hash(counts)
+
+        keys = [term.encode("utf-8") for term in counts]
+        fits = [len(key) <= self.width for key in keys]  # longer terms cannot be known
+        query = np.array([k for k, ok in zip(keys, fits) if ok], dtype=self.terms.dtype)
+        values = [v for v, ok in zip(counts.values(), fits) if ok]
+        if not len(query):
+            return [], []
+
+        pos = np.searchsorted(self.terms, query)
+        pos[pos == len(self.terms)] = 0
+        found = self.terms[pos] == query
+        return self.term_index[pos[found]].tolist(), [v for v, f in zip(values, found) if f]
+
+    def transform(self, texts):
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            cols, tf = self._lookup(Counter(self._analyze(text)))
+            if cols:
+                tf = np.asarray(tf, dtype=np.float64)
+                if self.binary:
+                    tf = np.ones_like(tf)
+                elif self.sublinear_tf:
+                    tf = np.log(tf) + 1
+                if self.use_idf:
+                    tf = tf * self.idf_[cols]
+                if self.norm == "l2":
+                    tf = tf / math.sqrt(float(tf @ tf))
+                elif self.norm == "l1":
+                    tf = tf / float(np.abs(tf).sum())
+                indices.extend(cols)
+                data.extend(tf.tolist())
+            indptr.append(len(indices))
+
+        return csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+            shape=(len(indptr) - 1, self.n_features),
+        )
+
+
+class MappedNB:
+    """MultinomialNB.predict / predict_proba over memory-mapped weights."""
+
+    def __init__(self, directory, meta):
+        self.feature_log_prob = np.load(os.path.join(directory, "feature_log_prob.npy"), mmap_mode="r")
+        self.class_log_prior_ = np.load(os.path.join(directory, "class_log_prior.npy"), mmap_mode="r")
+        self.classes_ = np.array(meta["classes"], dtype=object)
+
+    def _joint_log_likelihood(self, X):
+        # sparse @ dense only reads the weight rows of the features present
+        return np.asarray(X @ self.feature_log_prob) + self.class_log_prior_
+
+    def predict(self, X):
+        return self.classes_[self._joint_log_likelihood(X).argmax(axis=1)]
+
+    def predict_proba(self, X):
+        jll = self._joint_log_likelihood(X)
+        jll -= jll.max(axis=1, keepdims=True)
+        proba = np.exp(jll)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+
+def load_mapped(directory=DEFAULT_DIR):
+    """Return (model, vectorizer) backed by the mapped files in directory."""
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    if meta.get("format_version") not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported artifact format {meta.get('format_version')}")
+    return MappedNB(directory, meta), MappedVectorizer(directory, meta)
+
+
+def has_mapped(directory=DEFAULT_DIR):
+    return os.path.exists(os.path.join(directory, META_FILE))
+
+
+def stale_sources(directory, source_dir):
+    """
+    Names of the .pkl files in source_dir that the mapped files in directory
+    were not exported from (all present ones if the export recorded none).
+    Empty when there are no pickles to compare with.
+    """
+    with open(os.path.join(directory, META_FILE)) as f:
+        recorded = json.load(f).get("sources") or {}
+    stale = []
+    for name in SOURCE_FILES:
+        path = os.path.join(source_dir, name)
+        if os.path.exists(path) and recorded.get(name) != _sha256(path):
+            stale.append(name)
+    return stale
+
+
+def prefault(model, vectorizer):
+    """Read every mapped page once so the first requests do not fault them in."""
+    arrays = [model.feature_log_prob, model.class_log_prior_, vectorizer.idf_]
+    if not vectorizer.hashing:
+        arrays += [vectorizer.terms, vectorizer.term_index]
+    for a in arrays:
+        a.view("u1").sum()
+
+
+def list_versions(model_dir):
+    """Names of the complete versions under model_dir/versions/, oldest first."""
+    root = os.path.join(model_dir, VERSIONS_DIR)
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    # train.py builds a version under a hidden name and renames it when done
+    return sorted(n for n in names if not n.startswith(".") and os.path.isdir(os.path.join(root, n)))
+
+
+if __name__ == "__main__":
+    from .loading import Load_Model, Load_Vectorizer
+
+    model_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(BASE_DIR, "model")
+    out = sys.argv[2] if len(sys.argv) > 2 else os.path.join(model_dir, "mmap")
+    export_artifacts(
+        Load_Model(os.path.join(model_dir, "model.pkl")),
+        Load_Vectorizer(os.path.join(model_dir, "vectorizer.pkl")),
+        out,
+        source_dir=model_dir,
+    )
+    print(f"[INFO] Memory-mapped artifacts written to {out}")
@@ -1,5 +1,18 @@
+"""
+Synthetic expense descriptions for training the categorizer.
+
+Rows are produced in chunks from a seeded generator, so any number of them
+can be streamed (to a CSV or straight into train.py) without being held in
+memory, and the same seed always yields the same rows.
+
+    python data_generator.py                                   # 7000 rows per category -> Training_data.csv
+    python -m ai_intratation.data_generator --rows 50000000 --out big.csv
+"""
+import argparse
+import csv
 import random
-import pandas as pd
+import string
+import time
 
 templates = {
     "Food": [
@@ -92,20 +105,53 @@ fillers = {
 
 ROWS_PER_CATEGORY = 7000
 Data_set_name = "Training_data.csv"
+CHUNK_SIZE = 100_000
+COLUMNS = ["description", "amount", "category"]
+
+# only draw the fillers a template actually uses
+_compiled = {
+    category: [(t, [f for _, f, _, _ in string.Formatter().parse(t) if f]) for t in texts]
+    for category, texts in templates.items()
+}
+_categories = list(templates)
+
+
+def generate_chunks(total_rows, chunk_size=CHUNK_SIZE, seed=0):
+    """
+    Yield lists of (description, amount, category) rows, total_rows in all.
+    Categories are interleaved so every chunk is balanced. Each chunk has its
+    own generator seeded from (seed, chunk number), which makes a chunk
+    reproducible on its own.
+    """
+    for start in range(0, total_rows, chunk_size):
+        rng = random.Random(f"{seed}:{start // chunk_size}")
+        rows = []
+        for i in range(start, min(start + chunk_size, total_rows)):
+            category = _categories[i % len(_categories)]
+            template, fields = rng.choice(_compiled[category])
+            desc = template.format(**{f: rng.choice(fillers[f]) for f in fields})
+            rows.append((desc, rng.randint(50, 25000), category))
+        yield rows
+
 
-data = []
+def write_csv(path, total_rows, chunk_size=CHUNK_SIZE, seed=0):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for rows in generate_chunks(total_rows, chunk_size, seed):
+            writer.writerows(rows)
 
-for category, texts in templates.items():
-    for _ in range(ROWS_PER_CATEGORY):
-        template = random.choice(texts)
-        desc = template.format(**{
-            k: random.choice(v) for k, v in fillers.items()
-        })
-        amount = random.randint(50, 25000)
-        data.append([desc, amount, category])
 
-df = pd.DataFrame(data, columns=["description", "amount", "category"])
-df.to_csv(Data_set_name, index=False)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic training data")
+    parser.add_argument("--rows", type=int, default=ROWS_PER_CATEGORY * len(templates))
+    parser.add_argument("--out", default=Data_set_name)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
 
-print("Rows generated:", len(df))
-print(df["category"].value_counts())
\ No newline at end of file
+    start = time.perf_counter()
+    write_csv(args.out, args.rows, args.chunk_size, args.seed)
+    elapsed = time.perf_counter() - start
+    print("Rows generated:", args.rows)
+    print(f"Generated in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
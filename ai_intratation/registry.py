@@ -0,0 +1,212 @@
+"""
+Versioned model registry with hot swapping.
+
+train.py writes every model to <model dir>/versions/<version>/. The registry
+serves the newest complete version (or the one pinned with MODEL_VERSION)
+and falls back to the files directly in <model dir> when there is none.
+
+A background thread per process polls for changes. A new version is
+loaded, paged in and run once on that thread, off the request path, and
+only then swapped in with a single assignment. Requests already running
+finish on the version they started with; if loading fails the old version
+keeps serving.
+"""
+import os
+import threading
+import time
+
+from . import artifacts
+from .loading import Load_Model, Load_Vectorizer
+
+BASELINE = "baseline"  # the unversioned files in the model directory
+WARM_UP_TEXTS = ["uber ride to the airport", "monthly electricity bill"]
+
+
+class LoadedModel:
+    """One loaded version. Never mutated: a swap replaces the whole object."""
+
+    def __init__(self, generation, version, path, fmt, model, vectorizer, signature, load_seconds):
+        self.generation = generation
+        self.version = version
+        self.path = path
+        self.format = fmt
+        self.model = model
+        self.vectorizer = vectorizer
+        self.signature = signature
+        self.load_seconds = load_seconds
+        self.loaded_at = time.time()
+
+
+class ModelRegistry:
+    def __init__(self, model_dir, model_format="auto", mmap_dir=None, pinned_version=None,
+                 check_interval=5.0, on_swap=None):
+        self.model_dir = model_dir
+        self.model_format = model_format
+        self.mmap_dir = mmap_dir  # override for the baseline's mapped files
+        self.pinned_version = pinned_version or None
+        self.check_interval = check_interval
+        self.on_swap = on_swap
+
+        self.active = None
+        self.previous_version = None
+        self.swaps = 0
+        self.last_check = None
+        self.load_error = None
+        self._failed_signature = None
+        self._lock = threading.Lock()  # one load at a time
+        self._loaded = threading.Event()
+        self._watching = False
+
+    # ---------------- RESOLVING ----------------
+    def _candidate(self):
+        """(version, directory) that should be serving right now."""
+        if self.pinned_version:
+            return self.pinned_version, os.path.join(
+                self.model_dir, artifacts.VERSIONS_DIR, self.pinned_version)
+
+        versions = artifacts.list_versions(self.model_dir)
+        if versions:
+            return versions[-1], os.path.join(self.model_dir, artifacts.VERSIONS_DIR, versions[-1])
+        return BASELINE, self.model_dir
+
+    def _files(self, version, path):
+        """(format, mmap dir, files whose change means a reload)."""
+        mmap_dir = self.mmap_dir if version == BASELINE and self.mmap_dir else os.path.join(path, "mmap")
+        pickles = tuple(os.path.join(path, name) for name in artifacts.SOURCE_FILES)
+        use_mmap = artifacts.has_mapped(mmap_dir) if self.model_format == "auto" \
+            else self.model_format == "mmap"
+        if use_mmap:
+            # the pickles too: replacing them without re-exporting must not go unnoticed
+            return "mmap", mmap_dir, (os.path.join(mmap_dir, artifacts.META_FILE),) + \
+                tuple(f for f in pickles if os.path.exists(f))
+        return "pickle", mmap_dir, pickles
+
+    @staticmethod
+    def _signature(version, files):
+        stats = [os.stat(f) for f in files]
+        return (version,) + tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+    # ---------------- LOADING ----------------
+    def _load(self, version, path):
+        start = time.perf_counter()
+        fmt, mmap_dir, files = self._files(version, path)
+        signature = self._signature(version, files)
+
+        if fmt == "mmap":
+            stale = artifacts.stale_sources(mmap_dir, path)
+            if stale:
+                print(f"[WARN] {mmap_dir} was not exported from the current {' and '.join(stale)}; "
+                      f"run python -m ai_intratation.artifacts to regenerate it")
+                if self.model_format == "auto":
+                    print(f"[WARN] Serving model {version} from the pickles until then")
+                    fmt = "pickle"
+
+        if fmt == "mmap":
+            print(f"[INFO] Loading memory-mapped model {version} from {mmap_dir}")
+            model, vectorizer = artifacts.load_mapped(mmap_dir)
+            artifacts.prefault(model, vectorizer)
+        else:
+            model = Load_Model(os.path.join(path, "model.pkl"))
+            vectorizer = Load_Vectorizer(os.path.join(path, "vectorizer.pkl"))
+        # first call initializes lazy state (imports, caches) before any request sees it
+        model.predict_proba(vectorizer.transform(WARM_UP_TEXTS))
+
+        generation = self.active.generation + 1 if self.active else 1
+        return LoadedModel(generation, version, path, fmt, model, vectorizer, signature,
+                           time.perf_counter() - start)
+
+    def _swap(self, loaded):
+        old, self.active = self.active, loaded  # readers see the old or the new object, never a mix
+        self.load_error = None
+        self._failed_signature = None
+        if old is not None:
+            self.previous_version = old.version
+            self.swaps += 1
+            print(f"[INFO] Model {old.version} -> {loaded.version} "
+                  f"(loaded in {loaded.load_seconds:.2f}s)")
+        else:
+            print(f"[INFO] Model {loaded.version} loaded in {loaded.load_seconds:.2f}s")
+        self._loaded.set()
+        if self.on_swap:
+            self.on_swap(old, loaded)
+
+    def load(self):
+        """Load the current version once; later calls return immediately."""
+        if self._loaded.is_set():
+            return self.active
+
+        with self._lock:
+            if not self._loaded.is_set():
+                try:
+                    self._swap(self._load(*self._candidate()))
+                except Exception as e:
+                    self.load_error = str(e)
+                    raise
+        return self.active
+
+    def check(self):
+        """Swap in a new version if one appeared; keep the current one on any error."""
+        if not self._loaded.is_set():
+            return
+
+        with self._lock:
+            self.last_check = time.time()
+            version, path = self._candidate()
+            try:
+                signature = self._signature(version, self._files(version, path)[2])
+            except OSError as e:
+                print(f"[WARN] Could not stat model {version}: {e}")
+                return
+            if signature == self.active.signature:
+                self.load_error = None  # e.g. a broken newer version was removed again
+                return
+            if signature == self._failed_signature:
+                return
+
+            try:
+                loaded = self._load(version, path)
+            except Exception as e:
+                # remembered so a broken version is not reloaded on every poll
+                self._failed_signature = signature
+                self.load_error = f"{version}: {e}"
+                print(f"[WARN] Keeping model {self.active.version}, loading {version} failed: {e}")
+                return
+            self._swap(loaded)
+
+    # ---------------- WATCHING ----------------
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[WARN] Model check failed: {e}")
+
+    def start_watching(self):
+        """Start the polling thread; startup may call this again, only the first call starts it."""
+        if self.check_interval <= 0 or self._watching:
+            return
+        self._watching = True
+        threading.Thread(target=self._watch, name="model-watcher", daemon=True).start()
+
+    def is_ready(self) -> bool:
+        return self._loaded.is_set()
+
+    def stats(self) -> dict:
+        active = self.active
+        return {
+            "active_version": active.version if active else None,
+            "path": active.path if active else None,
+            "format": active.format if active else None,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(active.loaded_at))
+            if active else None,
+            "load_seconds": round(active.load_seconds, 3) if active else None,
+            "previous_version": self.previous_version,
+            "swaps": self.swaps,
+            "pinned_version": self.pinned_version,
+            "available_versions": artifacts.list_versions(self.model_dir),
+            "check_interval": self.check_interval,
+            "last_check": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.last_check))
+            if self.last_check else None,
+            "load_error": self.load_error,
+        }
@@ -0,0 +1,6 @@
+def percentile(samples, pct):
+    """Nearest-rank percentile (pct in 0-100) of a list of numbers; 0.0 when empty."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
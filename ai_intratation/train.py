@@ -0,0 +1,292 @@
+"""
+Train the expense categorizer and write model.pkl, vectorizer.pkl, the
+memory-mapped copy (artifacts.py) and metrics.json as a new version under
+<model dir>/versions/<version>/.
+
+    python -m ai_intratation.train Training_data.csv                      # TF-IDF, in memory
+    python -m ai_intratation.train Training_data.csv --vectorizer hashed  # streamed from the CSV
+    python -m ai_intratation.train --generate 20000000                    # streamed synthetic rows
+
+"tfidf" is the original vocabulary-based TfidfVectorizer; it needs the whole
+dataset in memory to build the vocabulary. "hashed" hashes n-grams into a
+fixed number of columns (HashingVectorizer) and applies the same IDF
+weighting, so it carries no vocabulary and is trained in chunks: one pass
+to count document frequencies, one pass of MultinomialNB.partial_fit and
+one pass to score the held-out rows. Memory stays at one chunk plus the
+model however many rows there are.
+"""
+import argparse
+import csv
+from itertools import islice
+import json
+import os
+import time
+
+from joblib import dump
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.pipeline import Pipeline
+
+from . import artifacts, data_generator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODEL_DIRS = artifacts.MODEL_DIRS
+HASH_FEATURES = 2 ** 18
+TEST_SIZE = 0.2
+
+
+def load_training_data(path):
+    texts, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            texts.append(row["description"])
+            labels.append(row["category"])
+    return texts, labels
+
+
+def build_vectorizer(kind="tfidf", n_features=HASH_FEATURES):
+    if kind == "tfidf":
+        return TfidfVectorizer(lowercase=True, stop_words="english", ngram_range=(1, 2))
+    if kind == "hashed":
+        return Pipeline([
+            # raw counts, no sign flipping: MultinomialNB needs non-negative input
+            ("hash", HashingVectorizer(
+                n_features=n_features, lowercase=True, stop_words="english",
+                ngram_range=(1, 2), alternate_sign=False, norm=None,
+            )),
+            ("idf", TfidfTransformer()),
+        ])
+    raise ValueError(f"Unknown vectorizer '{kind}' (use tfidf or hashed)")
+
+
+def csv_chunks(path, chunk_size=data_generator.CHUNK_SIZE):
+    """Yield lists of (description, category) rows from a training CSV."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        while True:
+            rows = [(row["description"], row["category"]) for row in islice(reader, chunk_size)]
+            if not rows:
+                return
+            yield rows
+
+
+def generated_chunks(total_rows, chunk_size=data_generator.CHUNK_SIZE, seed=0):
+    for rows in data_generator.generate_chunks(total_rows, chunk_size, seed):
+        yield [(desc, category) for desc, _, category in rows]
+
+
+def train(texts, labels, kind="tfidf", n_features=HASH_FEATURES, test_size=TEST_SIZE, seed=42):
+    """Fit on a train split, score on the held-out split; returns (model, vectorizer, metrics)."""
+    train_x, test_x, train_y, test_y = train_test_split(
+        texts, labels, test_size=test_size, random_state=seed, stratify=labels
+    )
+
+    start = time.perf_counter()
+    vectorizer = build_vectorizer(kind, n_features)
+    model = MultinomialNB().fit(vectorizer.fit_transform(train_x), train_y)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accuracy = accuracy_score(test_y, model.predict(vectorizer.transform(test_x)))
+    metrics = {
+        "vectorizer": kind,
+        "n_features": int(model.feature_log_prob_.shape[1]),
+        "train_rows": len(train_x),
+        "test_rows": len(test_x),
+        "accuracy": round(float(accuracy), 6),
+        "timings": {
+            "fit_seconds": round(fit_seconds, 3),
+            "evaluate_seconds": round(time.perf_counter() - start, 3),
+        },
+    }
+    return model, vectorizer, metrics
+
+
+# ---------------- STREAMING ----------------
+def _held_out(start, n, test_size):
+    """Test-row mask for rows start..start+n, fixed by row number (same in every pass)."""
+    rows = np.arange(start, start + n, dtype=np.uint64)
+    # Knuth's multiplicative hash spreads the test rows evenly over sorted files too
+    return rows * np.uint64(2654435761) % np.uint64(2 ** 32) < np.uint64(test_size * 2 ** 32)
+
+
+def _split_chunks(make_chunks, test_size, timings):
+    """Yield (train_texts, train_labels, test_texts, test_labels) per chunk."""
+    chunks = make_chunks()
+    row = 0
+    while True:
+        start = time.perf_counter()
+        rows = next(chunks, None)
+        timings["data_seconds"] += time.perf_counter() - start
+        if rows is None:
+            return
+
+        test = _held_out(row, len(rows), test_size)
+        row += len(rows)
+        train_rows = [r for r, t in zip(rows, test) if not t]
+        test_rows = [r for r, t in zip(rows, test) if t]
+        yield ([r[0] for r in train_rows], [r[1] for r in train_rows],
+               [r[0] for r in test_rows], [r[1] for r in test_rows])
+
+
+def train_streaming(make_chunks, n_features=HASH_FEATURES, test_size=TEST_SIZE):
+    """
+    Train the hashed model over chunks without holding the dataset.
+
+    make_chunks() must return a fresh iterator of [(text, label), ...] lists
+    with the same rows each time; it is called once per pass. The result is
+    the same model as train(kind="hashed") fitted on the same training rows.
+    """
+    vectorizer = build_vectorizer("hashed", n_features)
+    hasher, idf = vectorizer.steps[0][1], vectorizer.steps[1][1]
+    timings = {"data_seconds": 0.0}
+
+    # pass 1: document frequencies -> idf, same formula as TfidfTransformer.fit
+    start = time.perf_counter()
+    df = np.zeros(n_features, dtype=np.int64)
+    train_rows, classes = 0, set()
+    for texts, labels, _, _ in _split_chunks(make_chunks, test_size, timings):
+        if texts:
+            df += np.bincount(hasher.transform(texts).indices, minlength=n_features)
+        train_rows += len(texts)
+        classes.update(labels)
+    if not train_rows:
+        raise ValueError("No training rows")
+    idf.idf_ = np.log((train_rows + 1) / (df + 1)) + 1.0
+    idf.n_features_in_ = n_features
+    timings["idf_seconds"] = time.perf_counter() - start
+    print(f"[INFO] idf pass: {train_rows:,} rows in {timings['idf_seconds']:.1f}s")
+
+    # pass 2: naive Bayes counts are additive, so partial_fit per chunk is exact
+    start = time.perf_counter()
+    model = MultinomialNB()
+    classes = np.array(sorted(classes), dtype=object)
+    for texts, labels, _, _ in _split_chunks(make_chunks, test_size, timings):
+        if texts:
+            model.partial_fit(vectorizer.transform(texts), labels, classes=classes)
+    timings["fit_seconds"] = time.perf_counter() - start
+    print(f"[INFO] fit pass: {timings['fit_seconds']:.1f}s")
+
+    # pass 3: score the held-out rows
+    start = time.perf_counter()
+    correct = test_rows = 0
+    for _, _, texts, labels in _split_chunks(make_chunks, test_size, timings):
+        if texts:
+            correct += int((model.predict(vectorizer.transform(texts)) == np.array(labels, dtype=object)).sum())
+            test_rows += len(texts)
+    timings["evaluate_seconds"] = time.perf_counter() - start
+    print(f"[INFO] evaluate pass: {test_rows:,} rows in {timings['evaluate_seconds']:.1f}s")
+
+    metrics = {
+        "vectorizer": "hashed",
+        "n_features": n_features,
+        "train_rows": train_rows,
+        "test_rows": test_rows,
+        "accuracy": round(correct / test_rows, 6) if test_rows else None,
+        "timings": {k: round(v, 3) for k, v in timings.items()},
+    }
+    return model, vectorizer, metrics
+
+
+def save(model, vectorizer, metrics, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    dump(model, os.path.join(out_dir, "model.pkl"))
+    dump(vectorizer, os.path.join(out_dir, "vectorizer.pkl"))
+    artifacts.export_artifacts(model, vectorizer, os.path.join(out_dir, "mmap"), source_dir=out_dir)
+    with open(os.path.join(out_dir, "metrics.json"), "w") as f:
+        json.dump(metrics, f, indent=2)
+
+
+def _new_version(root):
+    version = time.strftime("%Y%m%d-%H%M%S")
+    n = 1
+    while os.path.exists(os.path.join(root, version if n == 1 else f"{version}-{n}")):
+        n += 1
+    return version if n == 1 else f"{version}-{n}"
+
+
+def save_version(model, vectorizer, metrics, model_dir):
+    """Write a new version under model_dir/versions/ and return its directory."""
+    root = os.path.join(model_dir, artifacts.VERSIONS_DIR)
+    os.makedirs(root, exist_ok=True)
+    version = _new_version(root)
+    metrics["version"] = version
+
+    # build it under a hidden name, then rename: a version is complete or absent
+    tmp = os.path.join(root, f".{version}.tmp")
+    save(model, vectorizer, metrics, tmp)
+    out_dir = os.path.join(root, version)
+    os.rename(tmp, out_dir)
+    return out_dir
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024, 1)  # KiB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("data", nargs="?", help="CSV with description and category columns")
+    parser.add_argument("--generate", type=int, metavar="ROWS",
+                        help="train on this many synthetic rows instead of a CSV")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --generate")
+    parser.add_argument("--vectorizer", choices=sorted(MODEL_DIRS),
+                        help="default: tfidf for a CSV, hashed for --generate")
+    parser.add_argument("--n-features", type=int, default=HASH_FEATURES,
+                        help="columns of the hashed vectorizer")
+    parser.add_argument("--chunk-size", type=int, default=data_generator.CHUNK_SIZE)
+    parser.add_argument("--test-size", type=float, default=TEST_SIZE)
+    parser.add_argument("--out", help="write to this directory instead of a new version")
+    args = parser.parse_args()
+
+    if bool(args.data) == bool(args.generate):
+        parser.error("give either a CSV or --generate ROWS")
+    kind = args.vectorizer or ("hashed" if args.generate else "tfidf")
+    if kind == "tfidf" and args.generate:
+        parser.error("tfidf needs the whole dataset in memory; use --vectorizer hashed")
+
+    start = time.perf_counter()
+    if kind == "tfidf":
+        load_start = time.perf_counter()
+        texts, labels = load_training_data(args.data)
+        load_seconds = time.perf_counter() - load_start
+        model, vectorizer, metrics = train(texts, labels, kind, test_size=args.test_size)
+        metrics["timings"]["data_seconds"] = round(load_seconds, 3)
+    elif args.generate:
+        model, vectorizer, metrics = train_streaming(
+            lambda: generated_chunks(args.generate, args.chunk_size, args.seed),
+            args.n_features, args.test_size,
+        )
+    else:
+        model, vectorizer, metrics = train_streaming(
+            lambda: csv_chunks(args.data, args.chunk_size), args.n_features, args.test_size,
+        )
+
+    metrics["source"] = {"generated_rows": args.generate, "seed": args.seed} if args.generate \
+        else {"csv": os.path.abspath(args.data)}
+    metrics["chunk_size"] = args.chunk_size if kind == "hashed" else None
+    metrics["timings"]["total_seconds"] = round(time.perf_counter() - start, 3)
+    metrics["peak_rss_mb"] = _peak_rss_mb()
+    metrics["trained_at"] = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    if args.out:
+        save(model, vectorizer, metrics, args.out)
+        out_dir = args.out
+    else:
+        out_dir = save_version(model, vectorizer, metrics, MODEL_DIRS[kind])
+    print(f"[INFO] {json.dumps(metrics)}")
+    print(f"[INFO] Model written to {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,40 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Header
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy import Column, Integer, String, create_engine, ForeignKey, DateTime
+from sqlalchemy import (
+    Column, Integer, Float, String, Text, Boolean, create_engine, ForeignKey, DateTime, Index,
+    MetaData, Table, delete, event, func, literal, or_, select, true, tuple_, update
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
-from passlib.context import CryptContext
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from jose import jwt, JWTError
 from pydantic import BaseModel
 from datetime import datetime, timedelta
+from typing import Optional
 import os
 from dotenv import load_dotenv
+import anyio.to_thread
+import base64
+import codecs
 import csv
 import io
+import json
+import math
+import shutil
+import socket
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_intratation.cache import TTLCache
+from api.migrations import migrate, version_metadata
+from api.password_hashing import HashPoolFull, PasswordHasher
 
 # ---------------- CONFIG ----------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -21,21 +46,205 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 
+def resolve_database_url(value: str) -> str:
+    """A full SQLAlchemy URL is used as-is; a bare file name means SQLite under api/."""
+    if "://" not in value:
+        return f"sqlite:///{os.path.join(BASE_DIR, value)}"
+    if value.startswith("postgres://"):
+        # the scheme Heroku-style providers hand out; SQLAlchemy wants postgresql://
+        return "postgresql://" + value[len("postgres://"):]
+    return value
+
+
 DB_NAME = os.getenv("DATABASE_NAME", "users.db")
-DATABASE_URL = f"sqlite:///{os.path.join(BASE_DIR, DB_NAME)}"
+DATABASE_URL = resolve_database_url(os.getenv("DATABASE_URL") or DB_NAME)
+# Optional read replica for the read-only endpoints; defaults to the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+if DATABASE_REPLICA_URL:
+    DATABASE_REPLICA_URL = resolve_database_url(DATABASE_REPLICA_URL)
+
+# Wipe the database on startup. Off by default: data survives restarts.
+DB_RESET = os.getenv("DB_RESET", "false").lower() == "true"
+
+# Threads available to sync endpoints/dependencies (Starlette's default is 40)
+API_THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", "40"))
 
 ADMIN_IMPORT_KEY = os.getenv("ADMIN_IMPORT_KEY")
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD")
 
+# Authenticated-user cache (per process)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+
+# Batch prediction limits (texts per request / texts per model call)
+PREDICT_BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "50000"))
+PREDICT_BATCH_CHUNK_SIZE = int(os.getenv("PREDICT_BATCH_CHUNK_SIZE", "1000"))
+
+# Rows fetched per round trip while streaming a CSV export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+# CSV import: rows per INSERT batch, bytes per read, per-row errors reported
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+IMPORT_READ_SIZE = 1024 * 1024
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+# /expenses/import-default: users covered by each INSERT ... SELECT commit
+IMPORT_FANOUT_USERS_PER_BATCH = int(os.getenv("IMPORT_FANOUT_USERS_PER_BATCH", "500"))
+
+# Password hashing pool (argon2 runs here, not in the request threadpool).
+# Hashes waiting beyond PASSWORD_HASH_QUEUE get a 429 instead of queuing.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "64"))
+PASSWORD_HASH_MODE = os.getenv("PASSWORD_HASH_MODE", "thread")  # thread | process
+# argon2 cost: iterations, memory in KiB, lanes. Raising them upgrades old
+# hashes on the next successful login.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+# Background import jobs
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+# uploads wait here until their job runs; a job is only run by the host
+# that holds its file, unless IMPORT_SPOOL_SHARED says every host can read
+# the directory (e.g. a network mount)
+IMPORT_SPOOL_DIR = os.getenv("IMPORT_SPOOL_DIR") or os.path.join(BASE_DIR, "import_spool")
+IMPORT_SPOOL_SHARED = os.getenv("IMPORT_SPOOL_SHARED", "false").lower() == "true"
+# the process running a job refreshes its heartbeat this often and sweeps
+# for jobs orphaned by other processes
+IMPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("IMPORT_JOB_HEARTBEAT_SECONDS", "10"))
+# a "running" job whose heartbeat is this old (or whose owner process on this
+# host is gone) is re-queued
+IMPORT_JOB_STALE_SECONDS = int(os.getenv("IMPORT_JOB_STALE_SECONDS", "60"))
+
+# SQLite storage profile: "production" applies the pragmas below on every
+# new connection, "default" leaves SQLite's own defaults untouched
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # ms
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+}
+
+# Connection pool, per engine (the replica defaults to the primary's sizing)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_REPLICA_POOL_SIZE = int(os.getenv("DB_REPLICA_POOL_SIZE", str(DB_POOL_SIZE)))
+DB_REPLICA_MAX_OVERFLOW = int(os.getenv("DB_REPLICA_MAX_OVERFLOW", str(DB_MAX_OVERFLOW)))
+
 # ---------------- DATABASE ----------------
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(bind=engine)
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def _is_sqlite(url) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _engine_options(url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW) -> dict:
+    options = {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options["pool_pre_ping"] = True
+    return options
+
+
+def create_db_engine(url: str, **pool):
+    db_engine = create_engine(url, poolclass=QueuePool, **_engine_options(url, **pool))
+    if _is_sqlite(url) and SQLITE_PROFILE == "production":
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+def to_async_url(url: str):
+    """Same database, async driver: aiosqlite for SQLite, asyncpg for Postgres."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite")
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg")
+    return parsed
+
+
+def create_async_db_engine(url: str, **pool):
+    async_url = to_async_url(url)
+    db_engine = create_async_engine(
+        async_url, poolclass=AsyncAdaptedQueuePool, **_engine_options(async_url, **pool)
+    )
+    if _is_sqlite(url) and SQLITE_PROFILE == "production":
+        event.listen(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+REPLICA_POOL = {"pool_size": DB_REPLICA_POOL_SIZE, "max_overflow": DB_REPLICA_MAX_OVERFLOW}
+
+
+def build_engines():
+    """
+    (Re)create the primary and replica engines and their session factories.
+
+    Writes go to the primary. Read-only endpoints use the replica, which is
+    just the primary when DATABASE_REPLICA_URL is not set.
+    """
+    global engine, SessionLocal, async_engine, AsyncSessionLocal
+    global replica_engine, ReplicaSessionLocal, async_replica_engine, AsyncReplicaSessionLocal
+
+    engine = create_db_engine(DATABASE_URL)
+    async_engine = create_async_db_engine(DATABASE_URL)
+
+    if DATABASE_REPLICA_URL:
+        replica_engine = create_db_engine(DATABASE_REPLICA_URL, **REPLICA_POOL)
+        async_replica_engine = create_async_db_engine(DATABASE_REPLICA_URL, **REPLICA_POOL)
+    else:
+        replica_engine, async_replica_engine = engine, async_engine
+
+    SessionLocal = sessionmaker(bind=engine)
+    ReplicaSessionLocal = sessionmaker(bind=replica_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, expire_on_commit=False)
+
+
+build_engines()
 Base = declarative_base()
 
 
+def report_storage_settings(db_engine, role="primary"):
+    """Print the settings the database is actually running with."""
+    pool = db_engine.pool
+    print(
+        f"[INFO] DB {role}: {db_engine.url!r} pool={type(pool).__name__} "
+        f"size={pool.size()} timeout={DB_POOL_TIMEOUT}s"
+    )
+
+    if db_engine.dialect.name != "sqlite":
+        return
+
+    with db_engine.connect() as conn:
+        active = {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in SQLITE_PRAGMAS
+        }
+    settings = ", ".join(f"{name}={value}" for name, value in active.items())
+    print(f"[INFO] SQLite {role} profile '{SQLITE_PROFILE}': {settings}")
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -52,23 +261,62 @@ class Expense(Base):
     description = Column(String, nullable=False)
     amount = Column(Integer, nullable=False)
     category = Column(String, default="Miscellaneous")
+    # set when the category was predicted by the model during import
+    category_confidence = Column(Float, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # covering index for per-user GROUP BY category totals
+        Index("ix_expenses_user_category_amount", "user_id", "category", "amount"),
+        # keyset pagination on (created_at, id) within a user
+        Index("ix_expenses_user_created_id", "user_id", "created_at", "id"),
+    )
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    filename = Column(String)
+    file_path = Column(String, nullable=False)
+    auto_categorize = Column(Boolean, default=False)
+    status = Column(String, default="queued", index=True)  # queued/running/done/failed
+    imported_rows = Column(Integer, default=0)
+    skipped_rows = Column(Integer, default=0)
+    errors = Column(Text, default="[]")  # JSON list of {"line", "error"}
+    inference_seconds = Column(Float, nullable=True)
+    message = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String, nullable=True)  # "host:pid:token" of the running process
+    heartbeat_at = Column(DateTime, nullable=True)
+    resumed_rows = Column(Integer, default=0)  # imported_rows when the current run claimed it
+    spool_host = Column(String, nullable=True)  # host holding file_path; None = any host
 
-Base.metadata.create_all(bind=engine)
 
 # ---------------- SECURITY ----------------
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_QUEUE,
+    mode=PASSWORD_HASH_MODE,
+    time_cost=ARGON2_TIME_COST,
+    memory_cost=ARGON2_MEMORY_COST,
+    parallelism=ARGON2_PARALLELISM,
+)
 
 
-def verify_password(password: str, hashed: str) -> bool:
-    return pwd_context.verify(password, hashed)
+def hash_pool_busy():
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts in progress, try again shortly",
+        headers={"Retry-After": "1"}
+    )
 
 
 def create_access_token(data: dict, expires_minutes: int):
@@ -78,6 +326,26 @@ def create_access_token(data: dict, expires_minutes: int):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# ---------------- USER CACHE ----------------
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    role: str
+
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+def invalidate_user(user_id: int):
+    user_cache.discard(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    invalidate_user(target.id)
+
+
 # ---------------- SCHEMAS ----------------
 class SignupRequest(BaseModel):
     username: str
@@ -116,10 +384,18 @@ def get_db():
         db.close()
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """Session on the read replica (the primary when none is configured)."""
+    async with AsyncReplicaSessionLocal() as db:
+        yield db
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
@@ -128,100 +404,215 @@ def get_current_user(
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
+    # Fast path: the token carries the user id, so a warm cache needs no SQL
+    user_id = payload.get("uid")
+    if user_id is not None:
+        cached = user_cache.get(user_id)
+        if cached is not None and cached.username == username:
+            return cached
+
+    if user_id is not None:
+        query = select(User).where(User.id == user_id)
+    else:
+        # tokens issued before "uid" was added to the claims
+        query = select(User).where(User.username == username)
+
+    async with AsyncReplicaSessionLocal() as db:
+        user = (await db.execute(query)).scalars().first()
+
+    if not user and async_replica_engine is not async_engine:
+        # the replica may lag behind a user created moments ago
+        async with AsyncSessionLocal() as db:
+            user = (await db.execute(query)).scalars().first()
+
+    if not user or user.username != username:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+    current = CurrentUser(id=user.id, username=user.username, role=user.role)
+    user_cache.put(user.id, current)
+    return current
 
 
 # ---------------- APP ----------------
 app = FastAPI(title="Auth API")
 
 
-# ---------------- STARTUP: CREATE DEFAULT ADMIN ----------------
-@app.on_event("startup")
-def on_startup():
-    global engine, SessionLocal
+# ---------------- STARTUP: SCHEMA + DEFAULT ADMIN ----------------
+def reset_database():
+    """Throw away all data on the primary (DB_RESET=true only)."""
+    db_path = make_url(DATABASE_URL).database
 
-    db_path = os.path.join(BASE_DIR, DB_NAME)
+    if not _is_sqlite(DATABASE_URL) or not db_path or db_path == ":memory:":
+        Base.metadata.drop_all(bind=engine)
+        version_metadata.drop_all(bind=engine)
+        print("[RESET] Dropped all tables")
+        return
 
-    # Dispose engine created at import time to release the file lock
+    # Dispose engines created at import time to release the file lock
     engine.dispose()
 
     if os.path.exists(db_path):
         try:
             os.remove(db_path)
-            print(f"Deleted existing database: {db_path}")
+            # WAL mode side files must go with it
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            print(f"[RESET] Deleted existing database: {db_path}")
         except PermissionError as e:
             print(f"[WARN] Could not delete DB: {e}. Proceeding with existing file.")
 
-    # Recreate engine and session after deletion
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-    SessionLocal = sessionmaker(bind=engine)
+    # Recreate engines and sessions after deletion
+    build_engines()
+
 
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created")
+def bootstrap_admin():
+    """Create the .env admin once; an existing admin is left untouched (no rehash)."""
+    if not (ADMIN_USERNAME and ADMIN_PASSWORD):
+        print("ADMIN_USERNAME or ADMIN_PASSWORD not set in .env")
+        return
 
     db = SessionLocal()
     try:
-        if ADMIN_USERNAME and ADMIN_PASSWORD:
-            existing_admin = db.query(User).filter(User.username == ADMIN_USERNAME).first()
-            if not existing_admin:
-                admin_user = User(
-                    username=ADMIN_USERNAME,
-                    hashed_password=hash_password(ADMIN_PASSWORD),
-                    role="admin"
-                )
-                db.add(admin_user)
-                db.commit()
-                print(f"Default admin user '{ADMIN_USERNAME}' created")
-            else:
-                print(f"Admin user '{ADMIN_USERNAME}' already exists")
-        else:
-            print("ADMIN_USERNAME or ADMIN_PASSWORD not set in .env")
+        if db.query(User.id).filter(User.username == ADMIN_USERNAME).first():
+            print(f"Admin user '{ADMIN_USERNAME}' already exists")
+            return
+
+        db.add(User(
+            username=ADMIN_USERNAME,
+            hashed_password=password_hasher.hash_sync(ADMIN_PASSWORD),
+            role="admin"
+        ))
+        try:
+            db.commit()
+            print(f"Default admin user '{ADMIN_USERNAME}' created")
+        except IntegrityError:
+            # another worker created it first
+            db.rollback()
     finally:
         db.close()
 
 
+def prepare_database():
+    """Reset (when asked), migrate and create the admin. Safe to repeat."""
+    if DB_RESET:
+        reset_database()
+
+    migrate(engine, Base.metadata)
+    report_storage_settings(engine)
+    if replica_engine is not engine:
+        report_storage_settings(replica_engine, role="replica")
+    bootstrap_admin()
+
+
+@app.on_event("startup")
+def on_startup():
+    start = time.perf_counter()
+    ai_main.warm_up()  # loads in the background while the database is prepared
+
+    # in multi-worker mode start.py has already done this once, so every
+    # worker finds the schema current and the admin present
+    prepare_database()
+    resume_import_jobs()
+
+    print(f"[INFO] Database ready in {time.perf_counter() - start:.2f}s")
+
+
+@app.on_event("startup")
+async def configure_threadpool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # running imports stop after their current batch and go back to
+    # "queued"; resume_import_jobs() picks them up on the next start
+    import_stop.set()
+    await run_in_threadpool(import_executor.shutdown, wait=True, cancel_futures=True)
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    if async_replica_engine is not async_engine:
+        await async_replica_engine.dispose()
+
+
+# ---------------- READINESS ----------------
+@app.get("/ready")
+def ready(response: Response):
+    # the database is migrated before uvicorn accepts requests, so only the
+    # model can still be warming up here
+    model_ready = ai_main.is_ready()
+    if not model_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    info = ai_main.model_info()
+    return {
+        "status": "ready" if model_ready else "starting",
+        "model": "ready" if model_ready else ("failed" if info["load_error"] else "loading"),
+        "model_version": info["active_version"],
+        "model_load_seconds": info["load_seconds"],
+        "model_error": info["load_error"],
+    }
+
+
 # ---------------- SIGNUP ----------------
 @app.post("/signup")
-def signup(data: SignupRequest, db: Session = Depends(get_db)):
+async def signup(data: SignupRequest, db: AsyncSession = Depends(get_async_db)):
     validate_password(data.password)
 
-    if db.query(User).filter(User.username == data.username).first():
+    existing = await db.execute(select(User.id).where(User.username == data.username))
+    if existing.first():
         raise HTTPException(status_code=400, detail="User already exists")
 
+    try:
+        hashed = await password_hasher.hash(data.password)
+    except HashPoolFull:
+        raise hash_pool_busy()
+
     user = User(
         username=data.username,
-        hashed_password=hash_password(data.password),
+        hashed_password=hashed,
         role="user"
     )
 
     db.add(user)
-    db.commit()
+    await db.commit()
 
     return {"message": "Signup successful"}
 
 
 # ---------------- LOGIN ----------------
 @app.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(
-        User.username == form_data.username
-    ).first()
+    result = await db.execute(
+        select(User).where(User.username == form_data.username)
+    )
+    user = result.scalars().first()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    ok = False
+    if user:
+        try:
+            ok, new_hash = await password_hasher.verify(
+                form_data.password, user.hashed_password
+            )
+        except HashPoolFull:
+            raise hash_pool_busy()
+
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
         )
 
+    if new_hash:
+        # stored with older argon2 settings; upgrade it now we know the password
+        user.hashed_password = new_hash
+        await db.commit()
+
     token = create_access_token(
-        data={"sub": user.username},
+        data={"sub": user.username, "uid": user.id, "role": user.role},
         expires_minutes=ACCESS_TOKEN_EXPIRE_MINUTES
     )
 
@@ -230,13 +621,22 @@ def login(
 
 # ---------------- PROFILE ----------------
 @app.get("/profile", response_model=UserResponse)
-def profile(user: User = Depends(get_current_user)):
+async def profile(user: CurrentUser = Depends(get_current_user)):
     return {
         "username": user.username,
         "role": user.role
     }
 
 
+# ---------------- PASSWORD HASHING STATS ----------------
+@app.get("/auth/hash-stats")
+async def get_hash_stats(current_user: CurrentUser = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return password_hasher.stats()
+
+
 # ---------------- PASSWORD VALIDATION ----------------
 def validate_password(password: str):
     if len(password) < 8:
@@ -266,14 +666,14 @@ def validate_password(password: str):
 
 # ---------------- USER LIST ----------------
 @app.get("/users")
-def get_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def get_users(
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    users = db.query(User).all()
+    users = (await db.execute(select(User))).scalars().all()
 
     return [
         {
@@ -290,7 +690,12 @@ class TextInput(BaseModel):
     text: str
 
 
-from ai_intratation.ai_main import predict_text
+class BatchTextInput(BaseModel):
+    texts: list[str]
+
+
+from ai_intratation import ai_main
+from ai_intratation.ai_main import predict_text, predict_batch, cache_stats
 
 
 @app.post("/predict")
@@ -298,12 +703,109 @@ def post_predict(data: TextInput):
     return predict_text(data.text)
 
 
+@app.get("/predict/cache")
+def get_predict_cache_stats():
+    return cache_stats()
+
+
+@app.get("/admin/model")
+async def get_model_info(current_user: CurrentUser = Depends(get_current_user)):
+    """Model version this worker serves; new versions are swapped in without a restart."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return {"pid": os.getpid(), **ai_main.model_info()}
+
+
+def _batch_chunks(texts: list):
+    for start in range(0, len(texts), PREDICT_BATCH_CHUNK_SIZE):
+        yield texts[start:start + PREDICT_BATCH_CHUNK_SIZE]
+
+
+def _check_batch_size(count: int):
+    if count > PREDICT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {PREDICT_BATCH_MAX_SIZE} texts)"
+        )
+
+
+def _parse_ndjson_line(line: bytes) -> str:
+    try:
+        item = json.loads(line)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid NDJSON line")
+
+    if isinstance(item, dict):
+        item = item.get("text")
+    if not isinstance(item, str):
+        raise HTTPException(
+            status_code=400,
+            detail='Each NDJSON line must be a string or {"text": ...}'
+        )
+    return item
+
+
+async def _read_ndjson_texts(request: Request) -> list:
+    texts = []
+    pending = b""
+
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                texts.append(_parse_ndjson_line(line))
+        _check_batch_size(len(texts))
+
+    if pending.strip():
+        texts.append(_parse_ndjson_line(pending))
+        _check_batch_size(len(texts))
+
+    return texts
+
+
+@app.post("/predict/batch")
+async def post_predict_batch(request: Request):
+    """
+    Categorize many texts at once.
+
+    Accepts {"texts": [...]} as JSON, or an NDJSON body
+    (Content-Type: application/x-ndjson) with one text per line, in which
+    case results are streamed back as NDJSON in the same order.
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("application/x-ndjson"):
+        texts = await _read_ndjson_texts(request)
+
+        async def stream_results():
+            for chunk in _batch_chunks(texts):
+                results = await run_in_threadpool(predict_batch, chunk)
+                yield "".join(json.dumps(r) + "\n" for r in results)
+
+        return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+    try:
+        data = BatchTextInput(**await request.json())
+    except Exception:
+        raise HTTPException(status_code=400, detail='Expected JSON body {"texts": [...]}')
+
+    _check_batch_size(len(data.texts))
+
+    results = []
+    for chunk in _batch_chunks(data.texts):
+        results.extend(await run_in_threadpool(predict_batch, chunk))
+
+    return {"count": len(results), "results": results}
+
+
 # ---------------- EXPENSES ----------------
 @app.post("/expenses")
-def add_expense(
+async def add_expense(
     data: ExpenseCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     expense = Expense(
         description=data.description.strip().lower(),
@@ -313,27 +815,62 @@ def add_expense(
     )
 
     db.add(expense)
-    db.commit()
-    db.refresh(expense)
+    await db.commit()
 
     return {"message": "Expense added"}
 
 
+def encode_cursor(created_at: datetime, expense_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{expense_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, expense_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(expense_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @app.get("/expenses/recent")
-def get_recent_expenses(
+async def get_recent_expenses(
+    response: Response,
     limit: int = 20,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
+    """
+    Newest expenses first, one page at a time.
+
+    Pass the X-Next-Cursor header of a page back as ?cursor= to get the
+    next one; the header is absent on the last page.
+    """
     limit = max(1, min(limit, 1000))
 
-    expenses = (
-        db.query(Expense)
-        .filter(Expense.user_id == current_user.id)
-        .order_by(Expense.created_at.desc())
-        .limit(limit)
-        .all()
+    query = select(Expense).where(Expense.user_id == current_user.id)
+
+    if cursor:
+        created_at, expense_id = decode_cursor(cursor)
+        # keyset seek: constant cost however deep the page is
+        query = query.where(
+            tuple_(Expense.created_at, Expense.id) < (created_at, expense_id)
+        )
+
+    # one extra row tells us whether another page exists
+    result = await db.execute(
+        query
+        .order_by(Expense.created_at.desc(), Expense.id.desc())
+        .limit(limit + 1)
     )
+    expenses = result.scalars().all()
+
+    if len(expenses) > limit:
+        expenses = expenses[:limit]
+        last = expenses[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
 
     return [
         {
@@ -341,149 +878,736 @@ def get_recent_expenses(
             "description": e.description,
             "amount": e.amount,
             "category": e.category,
+            "category_confidence": e.category_confidence,
             "created_at": e.created_at.isoformat()
         }
         for e in expenses
     ]
 
 
+# ---------------- EXPENSE SUMMARY ----------------
+def _month_bucket(db: AsyncSession):
+    if db.bind.dialect.name == "postgresql":
+        return func.to_char(Expense.created_at, "YYYY-MM")
+    return func.strftime("%Y-%m", Expense.created_at)
+
+
+@app.get("/expenses/summary")
+async def get_expense_summary(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    by_month: bool = False,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Per-category totals computed in SQL; start is inclusive, end exclusive."""
+    filters = [Expense.user_id == current_user.id]
+    if start:
+        filters.append(Expense.created_at >= start)
+    if end:
+        filters.append(Expense.created_at < end)
+
+    rows = (await db.execute(
+        select(
+            Expense.category,
+            func.sum(Expense.amount),
+            func.count(Expense.id)
+        )
+        .where(*filters)
+        .group_by(Expense.category)
+        .order_by(func.sum(Expense.amount).desc())
+    )).all()
+
+    categories = [
+        {"category": category, "total": int(total or 0), "count": count}
+        for category, total, count in rows
+    ]
+
+    summary = {
+        "total": sum(c["total"] for c in categories),
+        "count": sum(c["count"] for c in categories),
+        "categories": categories
+    }
+
+    if by_month:
+        month = _month_bucket(db).label("month")
+        month_rows = (await db.execute(
+            select(month, Expense.category, func.sum(Expense.amount))
+            .where(*filters)
+            .group_by(month, Expense.category)
+            .order_by(month)
+        )).all()
+        summary["months"] = [
+            {"month": m, "category": category, "total": int(total or 0)}
+            for m, category, total in month_rows
+        ]
+
+    return summary
+
+
+# ---------------- EXPORT EXPENSES TO CSV ----------------
+def _export_rows(user_id: int):
+    """CSV text for a user's expenses, one chunk per fetched batch."""
+    db = ReplicaSessionLocal()
+    try:
+        stmt = (
+            select(
+                Expense.id,
+                Expense.description,
+                Expense.amount,
+                Expense.category,
+                Expense.created_at
+            )
+            .where(Expense.user_id == user_id)
+            .order_by(Expense.created_at.desc(), Expense.id.desc())
+            .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+        )
+        result = db.execute(stmt)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["ID", "Description", "Amount", "Category", "Date"])
+
+        for batch in result.partitions():
+            for e_id, description, amount, category, created_at in batch:
+                writer.writerow([
+                    e_id,
+                    description,
+                    amount,
+                    category or "",
+                    created_at.isoformat() if created_at else ""
+                ])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def _export_bytes(user_id: int, compress: bool):
+    if not compress:
+        for text in _export_rows(user_id):
+            yield text.encode("utf-8")
+        return
+
+    gzipper = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for text in _export_rows(user_id):
+        data = gzipper.compress(text.encode("utf-8"))
+        if data:
+            yield data
+    yield gzipper.flush()
+
+
+@app.get("/expenses/export")
+def export_expenses(
+    gzip: bool = False,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Stream every expense of the user as CSV (optionally gzipped), with flat memory."""
+    filename = "expenses.csv.gz" if gzip else "expenses.csv"
+
+    return StreamingResponse(
+        _export_bytes(current_user.id, gzip),
+        media_type="application/gzip" if gzip else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
 # ---------------- DELETE ALL EXPENSES (ADMIN) ----------------
 @app.delete("/expenses/delete-all")
-def delete_all_expenses(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+async def delete_all_expenses(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
 
-    deleted = db.query(Expense).delete()
-    db.commit()
+    deleted = (await db.execute(delete(Expense))).rowcount
+    await db.commit()
 
     return {"message": f"{deleted} expenses deleted from all users"}
 
 
 # ---------------- DELETE EXPENSE ----------------
 @app.delete("/expenses/{expense_id}")
-def delete_expense(
+async def delete_expense(
     expense_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    expense = (
-        db.query(Expense)
-        .filter(
+    result = await db.execute(
+        delete(Expense).where(
             Expense.id == expense_id,
             Expense.user_id == current_user.id
         )
-        .first()
     )
 
-    if not expense:
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Expense not found")
 
-    db.delete(expense)
-    db.commit()
+    await db.commit()
 
     return {"message": "Expense removed"}
 
 
 # ---------------- IMPORT EXPENSES FROM CSV ----------------
-@app.post("/expenses/import")
-async def import_expenses(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    if not file.filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only CSV files allowed")
+def iter_text_lines(binary_file, chunk_size=IMPORT_READ_SIZE):
+    """Decode an uploaded file incrementally, yielding lines for csv.reader."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()  # handles Excel CSV
+    pending = ""
+
+    while True:
+        chunk = binary_file.read(chunk_size)
+        pending += decoder.decode(chunk, final=not chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if not chunk:
+            break
+
+    if pending:
+        yield pending
+
+
+# expenses.amount is an Integer column: 32-bit on PostgreSQL
+MAX_AMOUNT = 2 ** 31 - 1
+
+
+def parse_expense_row(row: dict) -> dict:
+    row = {
+        k.strip(): v.strip() if isinstance(v, str) else ""
+        for k, v in row.items() if k
+    }
 
-    content = await file.read()
-    decoded = content.decode("utf-8-sig")  # handles Excel CSV
+    description = row.get("Description")
+    amount = row.get("Amount")
 
-    reader = csv.DictReader(io.StringIO(decoded))
+    if not description or not amount:
+        raise ValueError("Description and Amount are required")
 
-    imported_count = 0
-    skipped_rows = 0
+    # checked here so one bad value is a row error, not a failed batch insert
+    value = float(amount)
+    if not math.isfinite(value) or abs(value) > MAX_AMOUNT:
+        raise ValueError(f"Amount out of range: {amount}")
+
+    return {
+        "description": description.lower(),
+        "amount": int(value),
+        "category": row.get("Category") or None
+    }
+
+
+def fill_categories(batch: list, auto_categorize: bool = False) -> float:
+    """
+    Give every row without a Category one, in place.
+
+    With auto_categorize the distinct descriptions of the batch are
+    classified in one predict_batch call; otherwise they fall back to
+    "Miscellaneous". Returns the seconds spent in the model.
+    """
+    missing = [expense for expense in batch if not expense["category"]]
+    if not missing:
+        return 0.0
+
+    if not auto_categorize:
+        for expense in missing:
+            expense["category"] = "Miscellaneous"
+        return 0.0
+
+    start = time.perf_counter()
+    descriptions = list(dict.fromkeys(e["description"] for e in missing))
+    predictions = dict(zip(descriptions, predict_batch(descriptions)))
+
+    for expense in missing:
+        result = predictions[expense["description"]]
+        expense["category"] = result["prediction"]
+        expense["category_confidence"] = result["confidence"]
+    return time.perf_counter() - start
+
+
+def iter_expense_batches(binary_file, report: dict, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Parse a CSV upload into lists of expense dicts of at most batch_size.
+
+    Bad rows are counted in report["skipped_rows"] and described in
+    report["errors"] (capped at IMPORT_MAX_ERRORS).
+    """
+    reader = csv.DictReader(iter_text_lines(binary_file))
+    batch = []
 
     for row in reader:
         try:
-            row = {k.strip(): v.strip() if v else "" for k, v in row.items()}
+            batch.append(parse_expense_row(row))
+        except Exception as e:
+            report["skipped_rows"] += 1
+            if len(report["errors"]) < IMPORT_MAX_ERRORS:
+                report["errors"].append({"line": reader.line_num, "error": str(e)})
+            else:
+                report["errors_truncated"] = True
+            continue
 
-            description = row.get("Description")
-            amount = row.get("Amount")
-            category = row.get("Category") or "Miscellaneous"
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def bulk_import_expenses(binary_file, user_id: int, batch_size=IMPORT_BATCH_SIZE,
+                         auto_categorize: bool = False, skip_rows: int = 0,
+                         on_progress=None, stop=None, report=None) -> dict:
+    """
+    Stream a CSV file into the expenses table with one executemany per batch.
+
+    skip_rows valid rows are passed over first (to resume an interrupted
+    import). on_progress(conn, report) runs after every insert on the same
+    connection, before the commit, so whatever it writes commits together
+    with the batch. When the stop event is set the import ends after the
+    current batch with report["stopped"] set. A report dict passed in is
+    filled in place, so the caller keeps the progress if the import raises.
+    """
+    report = {} if report is None else report
+    report.update({
+        "imported_rows": skip_rows,
+        "skipped_rows": 0,
+        "errors": [],
+        "errors_truncated": False
+    })
+    if auto_categorize:
+        report["inference_seconds"] = 0.0
+
+    with engine.connect() as conn:
+        for batch in iter_expense_batches(binary_file, report, batch_size):
+            if stop is not None and stop.is_set():
+                report["stopped"] = True
+                break
+
+            if skip_rows:
+                dropped = min(skip_rows, len(batch))
+                batch = batch[dropped:]
+                skip_rows -= dropped
+                if not batch:
+                    continue
+
+            elapsed = fill_categories(batch, auto_categorize)
+            if auto_categorize:
+                report["inference_seconds"] += elapsed
+
+            created_at = datetime.utcnow()
+            for expense in batch:
+                expense["user_id"] = user_id
+                expense["created_at"] = created_at
+                expense.setdefault("category_confidence", None)
+
+            conn.execute(Expense.__table__.insert(), batch)
+            imported = report["imported_rows"] + len(batch)
+            if on_progress:
+                on_progress(conn, dict(report, imported_rows=imported))
+            conn.commit()
+            report["imported_rows"] = imported
+
+    return report
+
+
+# ---------------- IMPORT JOBS ----------------
+import_executor = ThreadPoolExecutor(
+    max_workers=IMPORT_WORKERS, thread_name_prefix="import-job"
+)
+# set on shutdown: running imports stop after their current batch
+import_stop = threading.Event()
+# identifies this process as the owner of the jobs it runs
+PROCESS_OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+SPOOL_HOST = None if IMPORT_SPOOL_SHARED else socket.gethostname()
+_pending_jobs = set()  # submitted to import_executor and not finished yet
+_pending_lock = threading.Lock()
+_monitor_started = False
+
+
+def _job_progress(job_id: str, report: dict, **fields):
+    return (
+        update(ImportJob)
+        .where(ImportJob.id == job_id)
+        .values(
+            imported_rows=report["imported_rows"],
+            skipped_rows=report["skipped_rows"],
+            errors=json.dumps(report["errors"]),
+            inference_seconds=report.get("inference_seconds"),
+            updated_at=datetime.utcnow(),
+            **fields
+        )
+    )
 
-            if not description or not amount:
-                skipped_rows += 1
-                continue
 
-            expense = Expense(
-                description=description.lower(),
-                amount=int(float(amount)),
-                category=category,
-                user_id=current_user.id,
-                created_at=datetime.utcnow()
+def _save_job_progress(job_id: str, report: dict, **fields):
+    db = SessionLocal()
+    try:
+        db.execute(_job_progress(job_id, report, **fields))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _spool_readable():
+    """Filter for the jobs whose uploaded file this host can open."""
+    return or_(ImportJob.spool_host.is_(None), ImportJob.spool_host == socket.gethostname())
+
+
+def submit_import_job(job_id: str):
+    with _pending_lock:
+        if job_id in _pending_jobs:
+            return
+        _pending_jobs.add(job_id)
+    import_executor.submit(run_import_job, job_id)
+
+
+def run_import_job(job_id: str):
+    try:
+        _run_import_job(job_id)
+    finally:
+        with _pending_lock:
+            _pending_jobs.discard(job_id)
+
+
+def _run_import_job(job_id: str):
+    if import_stop.is_set():
+        return  # shutting down; the job stays queued for the next process
+
+    db = SessionLocal()
+    try:
+        # claim the job; another worker (or process) may have got it first
+        now = datetime.utcnow()
+        claimed = db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.status == "queued", _spool_readable())
+            .values(status="running", started_at=now, updated_at=now,
+                    owner=PROCESS_OWNER, heartbeat_at=now,
+                    resumed_rows=ImportJob.imported_rows)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.get(ImportJob, job_id)
+        user_id, file_path = job.user_id, job.file_path
+        auto_categorize, resume_from = job.auto_categorize, job.imported_rows or 0
+    finally:
+        db.close()
+
+    # filled in by bulk_import_expenses: on failure it holds the committed progress
+    report = {"imported_rows": resume_from, "skipped_rows": 0, "errors": []}
+    try:
+        with open(file_path, "rb") as f:
+            bulk_import_expenses(
+                f,
+                user_id,
+                auto_categorize=auto_categorize,
+                skip_rows=resume_from,
+                # the resume point commits with its batch, so a crash between
+                # the two can never import the batch twice
+                on_progress=lambda conn, r: conn.execute(_job_progress(job_id, r)),
+                stop=import_stop,
+                report=report,
             )
+        if report.get("stopped"):
+            # committed batches are kept; the next process resumes after them
+            _save_job_progress(job_id, report, status="queued", owner=None,
+                               message="Interrupted by shutdown, will resume")
+            print(f"[INFO] Import job {job_id} paused at {report['imported_rows']} rows")
+            return
+        _save_job_progress(
+            job_id, report, status="done", finished_at=datetime.utcnow(),
+            message="CSV import completed"
+        )
+    except Exception as e:
+        print(f"[WARN] Import job {job_id} failed: {e}")
+        _save_job_progress(
+            job_id, report, status="failed", finished_at=datetime.utcnow(), message=str(e)
+        )
+
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def _owner_gone(owner: str) -> bool:
+    """True when owner is a process on this host that no longer runs."""
+    if not owner or owner == PROCESS_OWNER:
+        return not owner
+    host, pid, _ = owner.rsplit(":", 2)
+    if host != socket.gethostname() or os.name == "nt":  # os.kill(pid, 0) kills on Windows
+        return False  # cannot tell; the heartbeat decides
+    if int(pid) == os.getpid():
+        return True  # an earlier process with our pid (e.g. a restarted container)
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
 
-            db.add(expense)
-            imported_count += 1
 
+def requeue_orphaned_jobs() -> int:
+    """Mark running jobs whose owner died (or stopped heartbeating) queued again."""
+    stale_before = datetime.utcnow() - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+    requeued = 0
+
+    db = SessionLocal()
+    try:
+        running = db.execute(
+            select(ImportJob.id, ImportJob.owner, ImportJob.heartbeat_at)
+            .where(ImportJob.status == "running")
+        ).all()
+        for job_id, owner, heartbeat_at in running:
+            stale = heartbeat_at is None or heartbeat_at < stale_before
+            if not (stale or _owner_gone(owner)):
+                continue
+            # only if nobody claimed it in the meantime
+            requeued += db.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.status == "running",
+                       ImportJob.owner == owner if owner else ImportJob.owner.is_(None))
+                .values(status="queued", owner=None)
+            ).rowcount
+        db.commit()
+    finally:
+        db.close()
+
+    if requeued:
+        print(f"[INFO] Re-queued {requeued} orphaned import job(s)")
+    return requeued
+
+
+def _heartbeat_jobs():
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(ImportJob)
+            .where(ImportJob.status == "running", ImportJob.owner == PROCESS_OWNER)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _submit_queued_jobs() -> int:
+    db = SessionLocal()
+    try:
+        queued = [
+            job_id for (job_id,) in
+            db.query(ImportJob.id).filter(ImportJob.status == "queued", _spool_readable())
+            .order_by(ImportJob.created_at)
+        ]
+    finally:
+        db.close()
+
+    for job_id in queued:
+        submit_import_job(job_id)
+    return len(queued)
+
+
+def _monitor_import_jobs():
+    while not import_stop.wait(IMPORT_JOB_HEARTBEAT_SECONDS):
+        try:
+            _heartbeat_jobs()
+            requeue_orphaned_jobs()
+            _submit_queued_jobs()  # also jobs paused by a process that shut down
         except Exception as e:
-            print("CSV IMPORT ERROR:", e)
-            skipped_rows += 1
+            print(f"[WARN] Import job monitor: {e}")
+
+
+def resume_import_jobs():
+    """
+    Re-queue jobs left behind by dead processes, hand queued ones to the pool
+    and keep doing both (plus this process's heartbeat) in the background.
+    """
+    global _monitor_started
+
+    requeue_orphaned_jobs()
+    resumed = _submit_queued_jobs()
+    if resumed:
+        print(f"[INFO] Resumed {resumed} import job(s)")
+
+    # startup can run again in the same process (e.g. the test client)
+    if not _monitor_started:
+        _monitor_started = True
+        threading.Thread(target=_monitor_import_jobs, name="import-job-monitor", daemon=True).start()
 
-    db.commit()
+
+def job_status(job: ImportJob) -> dict:
+    processed = (job.imported_rows or 0) + (job.skipped_rows or 0)
+    # rows from earlier runs of a resumed job do not count towards this run's rate
+    processed_this_run = processed - (job.resumed_rows or 0)
+    elapsed = None
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
 
     return {
-        "message": "CSV import completed",
-        "imported_rows": imported_count,
-        "skipped_rows": skipped_rows
+        "job_id": job.id,
+        "status": job.status,
+        "filename": job.filename,
+        "imported_rows": job.imported_rows or 0,
+        "skipped_rows": job.skipped_rows or 0,
+        "rows_processed": processed,
+        "rows_per_second": round(processed_this_run / elapsed) if elapsed else None,
+        "errors": json.loads(job.errors or "[]"),
+        "inference_seconds": job.inference_seconds,
+        "message": job.message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
     }
 
 
-# ---------------- IMPORT DEFAULT EXPENSES (ADMIN) ----------------
-@app.post("/expenses/import-default")
-async def import_default_expenses(
+@app.post("/expenses/import", status_code=202)
+def import_expenses(
     file: UploadFile = File(...),
-    admin_key: str = Header(None),
+    auto_categorize: bool = False,
     db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    if admin_key != ADMIN_IMPORT_KEY:
-        raise HTTPException(status_code=403, detail="Unauthorized")
+    """
+    Queue a CSV import and return its job id right away.
+
+    With ?auto_categorize=true rows without a Category are classified.
+    Poll GET /jobs/{job_id} for progress.
+    """
+    if not file.filename.lower().endswith(".csv"):
+        raise HTTPException(status_code=400, detail="Only CSV files allowed")
 
-    content = await file.read()
-    decoded = content.decode("utf-8-sig")
+    job_id = uuid.uuid4().hex
+    os.makedirs(IMPORT_SPOOL_DIR, exist_ok=True)
+    file_path = os.path.join(IMPORT_SPOOL_DIR, f"{job_id}.csv")
+
+    with open(file_path, "wb") as out:
+        shutil.copyfileobj(file.file, out, IMPORT_READ_SIZE)
+
+    db.add(ImportJob(
+        id=job_id,
+        user_id=current_user.id,
+        filename=file.filename,
+        file_path=file_path,
+        spool_host=SPOOL_HOST,
+        auto_categorize=auto_categorize
+    ))
+    db.commit()
 
-    reader = csv.DictReader(io.StringIO(decoded))
+    submit_import_job(job_id)
 
-    users = db.query(User).all()
+    return {
+        "message": "CSV import queued",
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}"
+    }
 
-    imported = 0
 
-    for row in reader:
-        row = {k.strip(): v.strip() for k, v in row.items()}
+@app.get("/jobs/{job_id}")
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    job = db.get(ImportJob, job_id)
 
-        description = row.get("Description")
-        amount = row.get("Amount")
-        category = row.get("Category") or "Miscellaneous"
+    if not job or (job.user_id != current_user.id and current_user.role != "admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
 
-        if not description or not amount:
-            continue
+    return job_status(job)
 
-        for user in users:
-            expense = Expense(
-                description=description.lower(),
-                amount=int(float(amount)),
-                category=category,
-                user_id=user.id,
-                created_at=datetime.utcnow()
-            )
-            db.add(expense)
-            imported += 1
 
-    db.commit()
+# ---------------- IMPORT DEFAULT EXPENSES (ADMIN) ----------------
+# Staging table for the CSV rows; TEMPORARY, so it is private to one connection
+staging_metadata = MetaData()
+import_staging = Table(
+    "import_staging",
+    staging_metadata,
+    Column("description", String, nullable=False),
+    Column("amount", Integer, nullable=False),
+    Column("category", String),
+    prefixes=["TEMPORARY"],
+)
+
+
+def fan_out_default_expenses(binary_file, users_per_batch=IMPORT_FANOUT_USERS_PER_BATCH) -> dict:
+    """
+    Copy every CSV row to every user with set-based SQL.
+
+    The rows are staged once, then expanded with INSERT ... SELECT
+    cross-joined against users, one commit per block of user ids.
+    """
+    report = {
+        "staged_rows": 0,
+        "skipped_rows": 0,
+        "errors": [],
+        "errors_truncated": False,
+        "inserted_records": 0
+    }
+    expenses = Expense.__table__
+    users = User.__table__
+
+    with engine.connect() as conn:
+        import_staging.create(conn, checkfirst=True)
+        try:
+            for batch in iter_expense_batches(binary_file, report):
+                fill_categories(batch)
+                conn.execute(import_staging.insert(), batch)
+                report["staged_rows"] += len(batch)
+
+            min_id, max_id = conn.execute(
+                select(func.min(users.c.id), func.max(users.c.id))
+            ).one()
+
+            if report["staged_rows"] and min_id is not None:
+                created_at = datetime.utcnow()
+
+                for low in range(min_id, max_id + 1, users_per_batch):
+                    fan_out = (
+                        select(
+                            import_staging.c.description,
+                            import_staging.c.amount,
+                            import_staging.c.category,
+                            users.c.id,
+                            literal(created_at, DateTime)
+                        )
+                        .select_from(import_staging.join(users, true()))
+                        .where(users.c.id >= low, users.c.id < low + users_per_batch)
+                    )
+                    result = conn.execute(
+                        expenses.insert().from_select(
+                            ["description", "amount", "category", "user_id", "created_at"],
+                            fan_out
+                        )
+                    )
+                    conn.commit()
+                    report["inserted_records"] += result.rowcount
+        finally:
+            import_staging.drop(conn, checkfirst=True)
+            conn.commit()
+
+    return report
+
+
+@app.post("/expenses/import-default")
+def import_default_expenses(
+    file: UploadFile = File(...),
+    admin_key: str = Header(None),
+):
+    if admin_key != ADMIN_IMPORT_KEY:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    start = time.perf_counter()
+    report = fan_out_default_expenses(file.file)
+    elapsed = time.perf_counter() - start
 
     return {
         "message": "Default expenses added to all users",
-        "inserted_records": imported
-    }
\ No newline at end of file
+        **report,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(report["inserted_records"] / elapsed) if elapsed else None
+    }
@@ -0,0 +1,164 @@
+from contextlib import contextmanager
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.exc import OperationalError
+from datetime import datetime
+import time
+
+# arbitrary key for pg_advisory_xact_lock, shared by every API process
+MIGRATION_LOCK_KEY = 726100216
+MIGRATION_LOCK_TIMEOUT = 300  # seconds to wait for another process's migration
+
+
+# ---------------- VERSION TABLE ----------------
+version_metadata = MetaData()
+schema_version = Table(
+    "schema_version",
+    version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+# ---------------- MIGRATIONS ----------------
+# Each migration is (version, description, fn(conn, metadata)). Version 0 is
+# the original users/expenses schema. migrate() runs them under a database
+# lock, so API workers starting together apply them one after the other;
+# steps still check before they change anything, as the first ones did.
+def _expense_indexes(conn, metadata):
+    for index in metadata.tables["expenses"].indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _expense_category_confidence(conn, metadata):
+    columns = {c["name"] for c in inspect(conn).get_columns("expenses")}
+    if "category_confidence" not in columns:
+        conn.execute(text("ALTER TABLE expenses ADD COLUMN category_confidence FLOAT"))
+
+
+def _import_jobs_table(conn, metadata):
+    table = metadata.tables["import_jobs"]
+    table.create(conn, checkfirst=True)
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _import_job_owner(conn, metadata):
+    columns = {c["name"] for c in inspect(conn).get_columns("import_jobs")}
+    if "owner" not in columns:
+        conn.execute(text("ALTER TABLE import_jobs ADD COLUMN owner VARCHAR"))
+    if "heartbeat_at" not in columns:
+        conn.execute(text("ALTER TABLE import_jobs ADD COLUMN heartbeat_at TIMESTAMP"))
+
+
+def _import_job_resumed_rows(conn, metadata):
+    columns = {c["name"] for c in inspect(conn).get_columns("import_jobs")}
+    if "resumed_rows" not in columns:
+        conn.execute(text("ALTER TABLE import_jobs ADD COLUMN resumed_rows INTEGER DEFAULT 0"))
+
+
+def _import_job_spool_host(conn, metadata):
+    columns = {c["name"] for c in inspect(conn).get_columns("import_jobs")}
+    if "spool_host" not in columns:
+        conn.execute(text("ALTER TABLE import_jobs ADD COLUMN spool_host VARCHAR"))
+
+
+MIGRATIONS = [
+    (1, "expense summary and pagination indexes", _expense_indexes),
+    (2, "expenses.category_confidence", _expense_category_confidence),
+    (3, "import_jobs table", _import_jobs_table),
+    (4, "import_jobs.owner and heartbeat_at", _import_job_owner),
+    (5, "import_jobs.resumed_rows", _import_job_resumed_rows),
+    (6, "import_jobs.spool_host", _import_job_spool_host),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _record(conn, version, description):
+    already = conn.execute(
+        select(schema_version.c.version).where(schema_version.c.version == version)
+    ).first()
+    if not already:
+        conn.execute(schema_version.insert().values(
+            version=version, description=description, applied_at=datetime.utcnow()
+        ))
+
+
+def current_version(conn) -> int:
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(select(schema_version.c.version).order_by(
+        schema_version.c.version.desc()
+    )).scalar() or 0
+
+
+@contextmanager
+def _locked(engine):
+    """
+    One transaction that no other migrate() can run alongside: BEGIN
+    IMMEDIATE takes SQLite's write lock up front, Postgres waits on an
+    advisory lock. Both keep the DDL inside the transaction.
+    """
+    if engine.dialect.name != "sqlite":
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            yield conn
+        return
+
+    # AUTOCOMMIT so the sqlite3 module leaves BEGIN/COMMIT to us
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        deadline = time.monotonic() + MIGRATION_LOCK_TIMEOUT
+        while True:
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+                break
+            except OperationalError as e:
+                # busy_timeout ran out while another process migrates
+                if "locked" not in str(e) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+        try:
+            yield conn
+        except BaseException:
+            conn.exec_driver_sql("ROLLBACK")
+            raise
+        conn.exec_driver_sql("COMMIT")
+
+
+def migrate(engine, metadata) -> int:
+    """
+    Bring the database up to LATEST_VERSION and return the version.
+
+    An empty database gets the current schema in one go; an existing one
+    only runs the migrations it has not seen yet. All of it happens in one
+    locked transaction, so concurrent callers wait and then find the work
+    done.
+    """
+    applied = []
+    with _locked(engine) as conn:
+        fresh = not inspect(conn).has_table("users")
+        version_metadata.create_all(conn)
+
+        if fresh:
+            metadata.create_all(conn)
+            _record(conn, LATEST_VERSION, "initial schema")
+            version = LATEST_VERSION
+        else:
+            version = current_version(conn)
+            for number, description, step in MIGRATIONS:
+                if number <= version:
+                    continue
+                step(conn, metadata)
+                _record(conn, number, description)
+                applied.append((number, description))
+                version = number
+
+    if fresh:
+        print(f"[INFO] Created database schema at version {version}")
+        return version
+    for number, description in applied:
+        print(f"[INFO] Applied migration {number}: {description}")
+    print(f"[INFO] Database schema at version {version}")
+    return version
@@ -0,0 +1,133 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from passlib.context import CryptContext
+import asyncio
+import threading
+import time
+
+from ai_intratation.stats import percentile
+
+
+class HashPoolFull(Exception):
+    """Raised when the hashing queue is full; the caller should answer 429."""
+
+
+# ---------------- WORKER SIDE ----------------
+# Built once per process: in the API process for thread mode, in every child
+# through the pool initializer for process mode.
+_context = None
+
+
+def _configure(time_cost, memory_cost, parallelism):
+    global _context
+    _context = CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__rounds=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+def _hash(password):
+    start = time.perf_counter()
+    hashed = _context.hash(password)
+    return hashed, time.perf_counter() - start
+
+
+def _verify(password, hashed):
+    start = time.perf_counter()
+    # new_hash is set when the stored hash used older cost settings
+    ok, new_hash = _context.verify_and_update(password, hashed)
+    return (ok, new_hash), time.perf_counter() - start
+
+
+# ---------------- POOL ----------------
+class PasswordHasher:
+    """
+    Bounded pool for argon2 hashing, separate from the request threadpool.
+
+    At most `workers` hashes run at once and at most `max_queue` more wait;
+    anything beyond that raises HashPoolFull instead of piling up. argon2
+    releases the GIL, so threads already use several cores; mode="process"
+    isolates the work in child processes instead.
+    """
+
+    def __init__(self, workers=2, max_queue=64, mode="thread",
+                 time_cost=3, memory_cost=65536, parallelism=4):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.mode = mode
+        self.settings = (time_cost, memory_cost, parallelism)
+
+        _configure(*self.settings)
+        if mode == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_configure, initargs=self.settings
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="argon2"
+            )
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._hash_seconds = deque(maxlen=1000)   # time inside argon2
+        self._wait_seconds = deque(maxlen=1000)   # time spent queued
+
+    def hash_sync(self, password: str) -> str:
+        """Blocking hash for startup code that runs outside the event loop."""
+        return _hash(password)[0]
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, hashed: str):
+        """Return (ok, new_hash); new_hash is None unless the hash needs upgrading."""
+        return await self._run(_verify, password, hashed)
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HashPoolFull()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+        try:
+            result, seconds = await asyncio.wrap_future(self._executor.submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        with self._lock:
+            self._completed += 1
+            self._hash_seconds.append(seconds)
+            self._wait_seconds.append(max(0.0, time.perf_counter() - submitted - seconds))
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            hash_ms = [s * 1000 for s in self._hash_seconds]
+            wait_ms = [s * 1000 for s in self._wait_seconds]
+            time_cost, memory_cost, parallelism = self.settings
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "time_cost": time_cost,
+                "memory_cost_kib": memory_cost,
+                "parallelism": parallelism,
+                "in_flight": min(self._pending, self.workers),
+                "queue_depth": max(0, self._pending - self.workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "hash_ms_avg": round(sum(hash_ms) / len(hash_ms), 3) if hash_ms else 0.0,
+                "hash_ms_p95": round(percentile(hash_ms, 95), 3),
+                "wait_ms_p95": round(percentile(wait_ms, 95), 3),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,38 @@
+"""
+Requests/sec on /expenses/recent, i.e. the cost of get_current_user.
+
+Start the API, then run this once against the old build and once against
+the new one:
+
+    python benchmarks/bench_auth.py --url http://127.0.0.1:8000 --user admin --password ...
+"""
+import argparse
+
+from loadtest import login, print_result, run_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    headers = {"Authorization": f"Bearer {login(url, args.user, args.password)}"}
+
+    result = run_load(
+        lambda http: http.get(
+            f"{url}/expenses/recent", params={"limit": args.limit}, headers=headers
+        ),
+        concurrency=args.concurrency,
+        duration=args.duration,
+    )
+    print_result(f"/expenses/recent (c={args.concurrency})", result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Cold-start time: launch a service and measure how long until it accepts
+connections, first answers a real request and (when it has one) until
+/ready says it is warm.
+
+    python benchmarks/bench_cold_start.py api      # uvicorn api.main:app, POST /predict
+    python benchmarks/bench_cold_start.py web      # flask_app.py, GET /login
+
+Run from the repository root with the usual .env in place, once on the
+old build and once on the new one.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = {
+    "api": {
+        "cmd": [sys.executable, "-m", "uvicorn", "api.main:app", "--port", "{port}"],
+        "port": 8010,
+        "probe": ("POST", "/predict", {"json": {"text": "uber ride to office"}}),
+    },
+    "web": {
+        "cmd": [sys.executable, "web_application/flask_app.py"],
+        "port": 5000,
+        "probe": ("GET", "/login", {}),
+    },
+}
+
+
+def wait_for(method, url, deadline, **kwargs):
+    while time.perf_counter() < deadline:
+        try:
+            code = requests.request(method, url, timeout=1, **kwargs).status_code
+            if code == 200:
+                return True
+            if code == 404:
+                return False  # endpoint does not exist in this build
+        except requests.RequestException:
+            pass
+        time.sleep(0.05)
+    return False
+
+
+def wait_listening(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            requests.get(url, timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.02)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("service", choices=sorted(SERVICES))
+    parser.add_argument("--timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    service = SERVICES[args.service]
+    port = service["port"]
+    base = f"http://127.0.0.1:{port}"
+    cmd = [part.format(port=port) for part in service["cmd"]]
+
+    try:
+        requests.get(base, timeout=1)
+        print(f"Something is already listening on port {port}; stop it first")
+        return
+    except requests.RequestException:
+        pass
+
+    start = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = start + args.timeout
+    try:
+        if wait_listening(base + "/ready", deadline):
+            print(f"{args.service}: accepting connections after {time.perf_counter() - start:.2f}s")
+
+        method, path, kwargs = service["probe"]
+        if not wait_for(method, base + path, deadline, **kwargs):
+            print(f"{args.service}: no answer from {path} within {args.timeout:.0f}s")
+            return
+        first = time.perf_counter() - start
+        print(f"{args.service}: first {method} {path} served after {first:.2f}s")
+
+        if wait_for("GET", base + "/ready", deadline):
+            print(f"{args.service}: /ready after {time.perf_counter() - start:.2f}s")
+        else:
+            print(f"{args.service}: /ready not available")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
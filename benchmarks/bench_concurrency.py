@@ -0,0 +1,72 @@
+"""
+Throughput and p99 latency of the API under many concurrent clients.
+
+Each client is an asyncio task with its own keep-alive connection that
+loops on GET /expenses/recent; the run is repeated for every level in
+--levels. Compare the sync build against the async one, and vary
+API_THREADPOOL_SIZE to see where the threadpool becomes the limit.
+
+    python benchmarks/bench_concurrency.py --password ... --levels 50,100,250,500
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from loadtest import login, percentile
+
+
+async def client(http, url, headers, deadline, latencies, errors):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await http.get(url, headers=headers)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append((time.perf_counter() - start) * 1000)
+        else:
+            errors[0] += 1
+
+
+async def run_level(url, headers, concurrency, duration):
+    latencies, errors = [], [0]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as http:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client(http, url, headers, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"c={concurrency:<5} {len(latencies) / elapsed:9.1f} req/s   "
+        f"p50 {percentile(latencies, 50):8.2f} ms   p99 {percentile(latencies, 99):8.2f} ms   "
+        f"errors {errors[0]}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--levels", default="50,100,250,500")
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--path", default="/expenses/recent?limit=20")
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/")
+    headers = {"Authorization": f"Bearer {login(base, args.user, args.password)}"}
+
+    for level in (int(x) for x in args.levels.split(",")):
+        asyncio.run(run_level(base + args.path, headers, level, args.duration))
+
+
+if __name__ == "__main__":
+    main()
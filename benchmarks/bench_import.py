@@ -0,0 +1,116 @@
+"""
+Rows/sec and peak server RSS for POST /expenses/import.
+
+Generates the CSV with sampledata_generater.py (streamed, so a 1M-row
+file costs no memory here), uploads it, and samples the API process RSS
+while the import runs.
+
+    python benchmarks/bench_import.py --rows 1000000 --password ... --api-pid <uvicorn pid>
+
+With --auto-categorize the file is written without a Category column and
+the server classifies every row (e.g. --rows 500000 --auto-categorize).
+"""
+import argparse
+import csv
+import os
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from loadtest import login
+from sampledata_generater import generate_rows, write_csv
+
+
+def sample_rss(pid, stop, peak):
+    import psutil
+
+    process = psutil.Process(pid)
+    while not stop.is_set():
+        peak[0] = max(peak[0], process.memory_info().rss)
+        time.sleep(0.05)
+
+
+def write_uncategorized_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Description", "Amount", "Date"])
+        for row_id, description, amount, _category, date in generate_rows(rows):
+            writer.writerow([row_id, description, amount, date])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--file", default=None, help="reuse an existing CSV")
+    parser.add_argument("--api-pid", type=int, help="sample this process's RSS")
+    parser.add_argument("--auto-categorize", action="store_true",
+                        help="upload rows without Category and let the model fill it")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    suffix = "_uncategorized" if args.auto_categorize else ""
+    path = args.file or os.path.join(ROOT, f"bench_import_{args.rows}{suffix}.csv")
+
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        if args.auto_categorize:
+            write_uncategorized_csv(path, args.rows)
+        else:
+            write_csv(path, args.rows)
+        print(f"generated {args.rows} rows in {time.perf_counter() - start:.1f}s -> {path}")
+
+    token = login(url, args.user, args.password)
+
+    stop, peak = threading.Event(), [0]
+    sampler = None
+    if args.api_pid:
+        sampler = threading.Thread(target=sample_rss, args=(args.api_pid, stop, peak))
+        sampler.start()
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        response = requests.post(
+            f"{url}/expenses/import",
+            params={"auto_categorize": "true"} if args.auto_categorize else None,
+            files={"file": (os.path.basename(path), f, "text/csv")},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    if sampler:
+        sampler.join()
+
+    response.raise_for_status()
+    report = response.json()
+
+    if "job_id" in report:
+        # imports run as background jobs; wait for this one to finish
+        headers = {"Authorization": f"Bearer {token}"}
+        while report.get("status") not in ("done", "failed"):
+            time.sleep(0.5)
+            report = requests.get(f"{url}/jobs/{report['job_id']}", headers=headers).json()
+        elapsed = time.perf_counter() - start
+        print(f"job {report['job_id']} {report['status']}: {report.get('message')}")
+
+    imported = report.get("imported_rows", 0)
+
+    print(f"imported {imported} rows in {elapsed:.1f}s = {imported / elapsed:,.0f} rows/sec")
+    print(f"skipped {report.get('skipped_rows', 0)} rows")
+    if report.get("inference_seconds"):
+        share = report["inference_seconds"] / elapsed * 100
+        print(f"model inference: {report['inference_seconds']:.1f}s ({share:.0f}% of the import)")
+    if args.api_pid:
+        print(f"peak API RSS: {peak[0] / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Inserted rows/sec and peak server RSS for POST /expenses/import-default.
+
+Optionally creates --users extra accounts first so the fan-out is
+rows x users. Run against the old and the new build to compare.
+
+    python benchmarks/bench_import_default.py --users 10000 --rows 200 --api-pid <pid>
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from bench_import import sample_rss
+from sampledata_generater import write_csv
+
+
+def create_users(url, count):
+    http = requests.Session()
+    for i in range(count):
+        http.post(f"{url}/signup", json={"username": f"bench{i}", "password": "benchpass1"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--admin-key", default=os.getenv("ADMIN_IMPORT_KEY", "supersecretkey123"))
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--users", type=int, default=0, help="accounts to create first")
+    parser.add_argument("--api-pid", type=int, help="sample this process's RSS")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    path = os.path.join(ROOT, f"bench_import_{args.rows}.csv")
+    if not os.path.exists(path):
+        write_csv(path, args.rows)
+
+    if args.users:
+        start = time.perf_counter()
+        create_users(url, args.users)
+        print(f"created {args.users} users in {time.perf_counter() - start:.1f}s")
+
+    stop, peak = threading.Event(), [0]
+    sampler = None
+    if args.api_pid:
+        sampler = threading.Thread(target=sample_rss, args=(args.api_pid, stop, peak))
+        sampler.start()
+
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        response = requests.post(
+            f"{url}/expenses/import-default",
+            files={"file": (os.path.basename(path), f, "text/csv")},
+            headers={"admin-key": args.admin_key},
+        )
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    if sampler:
+        sampler.join()
+
+    response.raise_for_status()
+    inserted = response.json()["inserted_records"]
+
+    print(f"inserted {inserted} rows in {elapsed:.1f}s = {inserted / elapsed:,.0f} rows/sec")
+    if args.api_pid:
+        print(f"peak API RSS: {peak[0] / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
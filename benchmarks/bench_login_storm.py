@@ -0,0 +1,72 @@
+"""
+Login storm: many concurrent /login calls while a second group of clients
+hits a cheap authenticated endpoint, to show whether argon2 work starves
+unrelated requests.
+
+    python benchmarks/bench_login_storm.py --url http://127.0.0.1:8000 --user admin --password ...
+
+Run it against the old build and the new one. With the hashing pool,
+/expenses/recent latency should barely move during the storm. Logins over
+the queue limit come back as 429 and are counted as rejected, not as
+latency.
+"""
+import argparse
+import threading
+
+import requests
+
+from loadtest import login, print_result, run_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--readers", type=int, default=8, help="concurrent /expenses/recent clients")
+    parser.add_argument("--duration", type=float, default=15)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    headers = {"Authorization": f"Bearer {login(url, args.user, args.password)}"}
+    form = {"username": args.user, "password": args.password}
+
+    def read(http):
+        return http.get(f"{url}/expenses/recent", params={"limit": 20}, headers=headers)
+
+    baseline = run_load(read, concurrency=args.readers, duration=args.duration / 3)
+    print_result(f"recent, idle (c={args.readers})", baseline)
+
+    rejected = [0]
+    lock = threading.Lock()
+
+    def send_login(http):
+        response = http.post(f"{url}/login", data=form)
+        if response.status_code == 429:
+            with lock:
+                rejected[0] += 1
+        return response
+
+    results = {}
+    storm = threading.Thread(target=lambda: results.setdefault(
+        "login", run_load(send_login, concurrency=args.logins, duration=args.duration)
+    ))
+    storm.start()
+    results["read"] = run_load(read, concurrency=args.readers, duration=args.duration)
+    storm.join()
+
+    print_result(f"recent, during storm (c={args.readers})", results["read"])
+    print_result(f"/login storm (c={args.logins})", results["login"])
+    print(f"{'login rejected (429)':<32} {rejected[0]}")
+
+    stats = requests.get(f"{url}/auth/hash-stats", headers=headers).json()  # admin user
+    print(
+        f"{'hash pool':<32} {stats['mode']} x{stats['workers']}   "
+        f"hash avg {stats['hash_ms_avg']} ms   p95 {stats['hash_ms_p95']} ms   "
+        f"queue wait p95 {stats['wait_ms_p95']} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
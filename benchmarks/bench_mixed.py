@@ -0,0 +1,80 @@
+"""
+Mixed read/write: /expenses/recent throughput while a CSV import runs.
+
+Measures readers alone first, then again while a background import job
+is writing. Run it with SQLITE_PROFILE=default and =production to see
+what WAL and the pragmas buy.
+
+    python benchmarks/bench_mixed.py --password ... --rows 200000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from loadtest import login, print_result, run_load
+from sampledata_generater import write_csv
+
+
+def run_import(url, token, path, outcome):
+    headers = {"Authorization": f"Bearer {token}"}
+    start = time.perf_counter()
+    with open(path, "rb") as f:
+        job = requests.post(
+            f"{url}/expenses/import",
+            files={"file": (os.path.basename(path), f, "text/csv")},
+            headers=headers,
+        ).json()
+
+    while job.get("status") not in ("done", "failed"):
+        time.sleep(0.25)
+        job = requests.get(f"{url}/jobs/{job['job_id']}", headers=headers).json()
+
+    outcome["job"] = job
+    outcome["seconds"] = time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    path = os.path.join(ROOT, f"bench_import_{args.rows}.csv")
+    if not os.path.exists(path):
+        write_csv(path, args.rows)
+
+    token = login(url, args.user, args.password)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def read(http):
+        return http.get(f"{url}/expenses/recent", params={"limit": 20}, headers=headers)
+
+    print_result("reads only", run_load(read, args.readers, args.duration))
+
+    outcome = {}
+    writer = threading.Thread(target=run_import, args=(url, token, path, outcome))
+    writer.start()
+    print_result("reads during import", run_load(read, args.readers, args.duration))
+    writer.join()
+
+    job = outcome["job"]
+    print(
+        f"import {job['status']}: {job['imported_rows']} rows in {outcome['seconds']:.1f}s "
+        f"= {job['imported_rows'] / outcome['seconds']:,.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Per-worker memory of the pickled vs. memory-mapped model.
+
+Starts N worker processes per format, each loading the model and making a
+prediction, and reads /proc/<pid>/smaps_rollup while all of them are alive:
+
+    RSS  resident pages, shared ones counted in full by every worker
+    PSS  shared pages divided between the workers that map them
+    USS  pages private to the worker (what a new worker really costs)
+
+    python benchmarks/bench_model_memory.py --workers 8
+    python benchmarks/bench_model_memory.py --workers 8 --synthetic 1000000
+
+--synthetic trains a throwaway model with roughly that many features so
+the difference is visible; the shipped model is only a few KB. Mapped
+pages are only read in when a request needs them; --touch-all reads them
+all up front to show a fully warmed worker. Linux only.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_intratation import artifacts  # noqa: E402
+
+WORKER = r"""
+import os, sys
+sys.path.insert(0, {root!r})
+fmt, model_dir, touch_all = sys.argv[1], sys.argv[2], sys.argv[3] == "1"
+if fmt == "mmap":
+    from ai_intratation.artifacts import load_mapped, prefault
+    model, vectorizer = load_mapped(os.path.join(model_dir, "mmap"))
+    if touch_all:  # fault in every page, as a long-running worker eventually does
+        prefault(model, vectorizer)
+else:
+    from joblib import load
+    model = load(os.path.join(model_dir, "model.pkl"))
+    vectorizer = load(os.path.join(model_dir, "vectorizer.pkl"))
+model.predict_proba(vectorizer.transform(["uber ride to the office", "monthly electricity bill"]))
+print("ready", flush=True)
+sys.stdin.read()  # stay alive until the parent has measured everyone
+"""
+
+
+def memory_kb(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                values[parts[0].rstrip(":")] = int(parts[1])
+    private = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    return values["Rss"], values["Pss"], private
+
+
+def measure(fmt, model_dir, workers, touch_all):
+    code = WORKER.format(root=ROOT)
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code, fmt, model_dir, "1" if touch_all else "0"],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    try:
+        for p in procs:
+            if p.stdout.readline().strip() != "ready":
+                raise RuntimeError(f"{fmt} worker failed to load the model")
+        samples = [memory_kb(p.pid) for p in procs]
+    finally:
+        for p in procs:
+            p.stdin.close()
+            p.wait()
+
+    rss, pss, uss = (sum(s[i] for s in samples) / len(samples) / 1024 for i in range(3))
+    print(f"{fmt:<7} x{workers}   RSS {rss:8.1f} MiB   PSS {pss:8.1f} MiB   USS {uss:8.1f} MiB"
+          f"   (total PSS {pss * workers:8.1f} MiB)")
+
+
+def build_synthetic(n_features, out_dir):
+    """Fit a throwaway TF-IDF + NB with about n_features unigram+bigram features."""
+    import random
+    from joblib import dump
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+
+    rng = random.Random(0)
+    words = [f"w{i:07d}" for i in range(max(1000, n_features // 5))]
+    docs = [" ".join(rng.choice(words) for _ in range(6)) for _ in range(n_features // 5)]
+    labels = [rng.randrange(8) for _ in docs]
+
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words="english")
+    X = vectorizer.fit_transform(docs)
+    model = MultinomialNB().fit(X, labels)
+
+    dump(model, os.path.join(out_dir, "model.pkl"))
+    dump(vectorizer, os.path.join(out_dir, "vectorizer.pkl"))
+    artifacts.export_artifacts(model, vectorizer, os.path.join(out_dir, "mmap"))
+    print(f"synthetic model: {X.shape[1]} features")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model-dir", default=os.path.join(ROOT, "ai_intratation", "model"),
+                        help="directory with model.pkl, vectorizer.pkl and mmap/")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="FEATURES")
+    parser.add_argument("--touch-all", action="store_true",
+                        help="read every mapped page first (worst case for mmap)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = args.model_dir
+        if args.synthetic:
+            model_dir = tmp
+            build_synthetic(args.synthetic, tmp)
+
+        for fmt in ("pickle", "mmap"):
+            measure(fmt, model_dir, args.workers, args.touch_all)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Prediction latency while the registry hot-swaps to a new model version.
+
+Builds a baseline and a retrained version in a scratch model directory,
+keeps --threads threads predicting through ai_main, publishes the new
+version (one rename, as train.py does) and reports latency before, around
+and after the swap, for the memory-mapped and the pickled format.
+
+    python benchmarks/bench_model_swap.py --data Training_data.csv
+    python benchmarks/bench_model_swap.py --data Training_data.csv --vectorizer hashed
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_intratation import train  # noqa: E402
+
+WORKER = r"""
+import os, sys, threading, time
+sys.path.insert(0, sys.argv[1])
+from ai_intratation import ai_main
+
+staged, threads, seconds = sys.argv[2], int(sys.argv[3]), float(sys.argv[4])
+ai_main.prediction_cache.max_size = 0  # measure the model, not the cache
+ai_main.load_artifacts()
+ai_main.registry.start_watching()
+
+samples, stop = [], threading.Event()
+def client(n):
+    while not stop.is_set():
+        start = time.perf_counter()
+        ai_main.predict_text(f"uber ride to the airport {n} {len(samples)}")
+        samples.append((start, time.perf_counter() - start))
+
+workers = [threading.Thread(target=client, args=(n,)) for n in range(threads)]
+for w in workers:
+    w.start()
+time.sleep(seconds)
+published = time.perf_counter()
+versions = os.path.join(ai_main.MODEL_DIR, "versions")
+os.makedirs(versions, exist_ok=True)
+os.rename(staged, os.path.join(versions, "20990101-000000"))
+while ai_main.registry.swaps == 0:
+    time.sleep(0.01)
+swapped = time.perf_counter()
+time.sleep(seconds)
+stop.set()
+for w in workers:
+    w.join()
+
+def report(label, lat):
+    lat = sorted(lat)
+    if not lat:
+        return print(f"  {label:<22} no requests")
+    pick = lambda p: lat[min(len(lat) - 1, int(len(lat) * p))] * 1000
+    print(f"  {label:<22} n={len(lat):>7}  p50 {pick(.5):6.2f} ms  p99 {pick(.99):6.2f} ms"
+          f"  max {lat[-1] * 1000:7.2f} ms")
+
+print(f"  swap took {swapped - published:.2f}s after publishing "
+      f"(load {ai_main.registry.active.load_seconds:.2f}s)")
+report("before", [l for s, l in samples if s < published])
+report("while loading/swapping", [l for s, l in samples if published <= s < swapped])
+report("after", [l for s, l in samples if s >= swapped])
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", required=True, help="training CSV")
+    parser.add_argument("--vectorizer", choices=sorted(train.MODEL_DIRS), default="tfidf",
+                        help="kind of the new version (the baseline is the shipped TF-IDF model)")
+    parser.add_argument("--n-features", type=int, default=train.HASH_FEATURES)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+
+    texts, labels = train.load_training_data(args.data)
+    model, vectorizer, metrics = train.train(texts, labels, args.vectorizer, args.n_features)
+
+    for fmt in ("mmap", "pickle"):
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = os.path.join(tmp, "model")
+            shutil.copytree(os.path.join(ROOT, "ai_intratation", "model"), model_dir,
+                            ignore=shutil.ignore_patterns("versions", "hashed"))
+            staged = os.path.join(tmp, "staged")
+            train.save(model, vectorizer, metrics, staged)
+
+            print(f"{fmt}:")
+            env = dict(os.environ, MODEL_DIR=model_dir, MODEL_FORMAT=fmt, MODEL_VERSION="",
+                       ARTIFACT_CHECK_INTERVAL="0.2")
+            subprocess.run([sys.executable, "-c", WORKER, ROOT, staged, str(args.threads), str(args.seconds)],
+                           env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
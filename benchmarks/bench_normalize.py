@@ -0,0 +1,89 @@
+"""
+p50/p99 latency of the original normalize_text vs the SpellCorrector one.
+
+    python benchmarks/bench_normalize.py --runs 2000 --symspell
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "web_application"))
+
+from spellchecker import SpellChecker
+from spelling import SpellCorrector, load_training_vocabulary, normalize_text
+
+PHRASES = [
+    "swigy food ordr",
+    "Uber cab ride to the airprt",
+    "electricty bill for febuary",
+    "netflx premium membrship",
+    "doctr consultation at apolo hospitl",
+    "amazon shoping order for headphnes and a laptop stand",
+    "movie tiket booking 450",
+    "grocery shoping at dmart vegetables fruts milk and bred",
+    "fuel refil at indianoil pump",
+    "giftt purchse for birthday",
+]
+
+
+def old_normalize_text(text, spell):
+    """normalize_text as it was before SpellCorrector (no memo, no fast path)."""
+    if not text:
+        return ""
+    text = text.strip().lower()
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return " ".join(spell.correction(word) or word for word in text.split())
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(name, fn, inputs):
+    samples = []
+    for text in inputs:
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{name:<24} p50 {percentile(samples, 50):8.3f} ms   "
+        f"p99 {percentile(samples, 99):8.3f} ms   n={len(samples)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--old-runs", type=int, default=50,
+                        help="the old path is slow, so it gets fewer runs")
+    parser.add_argument("--symspell", action="store_true",
+                        help="also benchmark the SymSpell index")
+    args = parser.parse_args()
+
+    inputs = [random.choice(PHRASES) for _ in range(args.runs)]
+    vocabulary = load_training_vocabulary()
+
+    spell = SpellChecker()
+    run("old normalize_text", lambda t: old_normalize_text(t, spell), inputs[:args.old_runs])
+
+    corrector = SpellCorrector(vocabulary=vocabulary)
+    run("memo + fast path", lambda t: normalize_text(t, corrector), inputs)
+    print(f"  cache: {corrector.cache_info()}")
+
+    if args.symspell:
+        corrector = SpellCorrector(vocabulary=vocabulary, use_symspell=True)
+        run("memo + symspell", lambda t: normalize_text(t, corrector), inputs)
+
+        # cold: every call misses the memo, so this is the raw index cost
+        cold = SpellCorrector(vocabulary=vocabulary, use_symspell=True, cache_size=0)
+        run("symspell (no memo)", lambda t: normalize_text(t, cold), inputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Rows/sec of the single-text prediction path vs the batch path.
+
+Runs in-process against ai_intratation.ai_main, and optionally over HTTP
+against a running API (--url http://127.0.0.1:8000).
+
+    python benchmarks/bench_predict_batch.py --rows 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+SAMPLE_TEXTS = [
+    "swiggy food order",
+    "uber cab ride",
+    "electricity bill for march",
+    "netflix premium membership",
+    "doctor consultation at apollo",
+    "amazon shopping order",
+    "movie ticket booking",
+    "gift purchase",
+    "fuel refill at hp",
+    "grocery shopping at dmart",
+]
+
+
+def make_texts(rows):
+    return [random.choice(SAMPLE_TEXTS) for _ in range(rows)]
+
+
+def report(name, rows, seconds):
+    print(f"{name:<30} {rows:>8} rows  {seconds:8.3f}s  {rows / seconds:12.0f} rows/sec")
+
+
+def bench_in_process(texts, chunk_size):
+    from ai_intratation import ai_main
+    from ai_intratation.ai_main import predict_text, predict_batch
+
+    # the prediction cache would hide the model cost of the single path
+    cache_size = ai_main.prediction_cache.max_size
+    ai_main.prediction_cache.max_size = 0
+    start = time.perf_counter()
+    for text in texts:
+        predict_text(text)
+    report("in-process single (no cache)", len(texts), time.perf_counter() - start)
+    ai_main.prediction_cache.max_size = cache_size
+
+    start = time.perf_counter()
+    for text in texts:
+        predict_text(text)
+    report("in-process single (cached)", len(texts), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), chunk_size):
+        predict_batch(texts[i:i + chunk_size])
+    report(f"in-process batch ({chunk_size})", len(texts), time.perf_counter() - start)
+
+
+def bench_http(texts, url, chunk_size, single_rows):
+    import requests
+
+    http = requests.Session()
+
+    single = texts[:single_rows]
+    start = time.perf_counter()
+    for text in single:
+        http.post(f"{url}/predict", json={"text": text}).raise_for_status()
+    report("http /predict", len(single), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), chunk_size):
+        http.post(
+            f"{url}/predict/batch", json={"texts": texts[i:i + chunk_size]}
+        ).raise_for_status()
+    report(f"http /predict/batch ({chunk_size})", len(texts), time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--chunk", type=int, default=1000)
+    parser.add_argument("--url", help="FastAPI base URL for the HTTP benchmark")
+    parser.add_argument("--single-rows", type=int, default=2000,
+                        help="rows sent through /predict one at a time")
+    args = parser.parse_args()
+
+    texts = make_texts(args.rows)
+
+    bench_in_process(texts, args.chunk)
+    if args.url:
+        bench_http(texts, args.url.rstrip("/"), args.chunk, args.single_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Throughput of the single-process dev launch vs. start.py --prod.
+
+Starts the API and web app the way start.py does (dev: one uvicorn and the
+Flask server; prod: gunicorn workers sized as start.py sizes them, from
+.env or the CPUs), loads each, then stops them. Ports 8000/5000 must be
+free and .env in place. /predict gets a new text on every request, so the
+prediction cache never answers it.
+
+    python benchmarks/bench_serving_modes.py --password ... --concurrency 64
+"""
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import start  # noqa: E402
+from loadtest import login, print_result, run_load  # noqa: E402
+
+API = "http://127.0.0.1:8000"
+WEB = "http://127.0.0.1:5000"
+
+
+def launch(production, workers):
+    os.makedirs(start.PID_DIR, exist_ok=True)
+    if production:
+        start.prepare_database()
+    api = subprocess.Popen(
+        start.api_command(production, workers["api_workers"]), cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    web = subprocess.Popen(
+        start.web_command(production, workers["web_workers"], workers["web_threads"]), cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    start.wait_until_ready("API", start.API_READY_URL, api)
+    start.wait_until_ready("WEB", start.WEB_READY_URL, web)
+    return api, web
+
+
+def measure(label, args):
+    headers = {"Authorization": f"Bearer {login(API, args.user, args.password)}"}
+    texts = itertools.count()
+    scenarios = [
+        ("POST /predict", lambda http: http.post(
+            f"{API}/predict", json={"text": f"uber ride to the airport {label} {next(texts)}"})),
+        ("GET /expenses/recent", lambda http: http.get(
+            f"{API}/expenses/recent", params={"limit": 20}, headers=headers)),
+        ("GET web /login", lambda http: http.get(f"{WEB}/login")),
+    ]
+    for name, send in scenarios:
+        result = run_load(send, concurrency=args.concurrency, duration=args.duration)
+        print_result(f"{label:<5} {name}", result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    args = parser.parse_args()
+
+    # use this interpreter rather than start.py's .venv
+    start.get_venv_python = lambda: sys.executable
+    workers = start.worker_settings(start.load_settings())
+    print(f"CPUs: {os.cpu_count()}  prod workers: {workers}")
+
+    for label, production in (("dev", False), ("prod", True)):
+        api, web = launch(production, workers)
+        try:
+            measure(label, args)
+        finally:
+            for process in (api, web):
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Streaming training at growing row counts: generation, per-pass timings,
+throughput and peak memory (which should stay flat as rows grow).
+
+    python benchmarks/bench_training.py --rows 100000 1000000 10000000
+
+Each size is trained on synthetic rows in a fresh process with
+`python -m ai_intratation.train --generate N` and read back from its
+metrics.json; nothing is written to the model directory.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000])
+    parser.add_argument("--n-features", type=int, default=2 ** 18)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>11} {'data s':>8} {'idf s':>8} {'fit s':>8} {'eval s':>8} {'total s':>8} "
+          f"{'rows/s':>9} {'peak MB':>8} {'accuracy':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            out = os.path.join(tmp, str(rows))
+            subprocess.run(
+                [sys.executable, "-m", "ai_intratation.train", "--generate", str(rows),
+                 "--n-features", str(args.n_features), "--chunk-size", str(args.chunk_size),
+                 "--out", out],
+                cwd=ROOT, check=True, stdout=subprocess.DEVNULL,
+            )
+            with open(os.path.join(out, "metrics.json")) as f:
+                m = json.load(f)
+            t = m["timings"]
+            print(f"{rows:>11,} {t['data_seconds']:>8.1f} {t['idf_seconds']:>8.1f} {t['fit_seconds']:>8.1f} "
+                  f"{t['evaluate_seconds']:>8.1f} {t['total_seconds']:>8.1f} "
+                  f"{rows / t['total_seconds']:>9,.0f} {m['peak_rss_mb']:>8.1f} {m['accuracy']:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Concurrent voice clips against the Flask /speech-to-text endpoint.
+
+    python benchmarks/bench_transcribe.py clip.webm --url http://127.0.0.1:5000 --concurrency 8 --password ...
+
+Compare WHISPER_INSTANCES / WHISPER_BATCH_SIZE settings; the pool's queue
+depth and per-clip latency are printed from /speech-to-text/stats, which
+needs an admin login.
+"""
+import argparse
+
+import requests
+
+from loadtest import print_result, run_load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("clip", help="audio file to send (webm/ogg/wav/mp3)")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/")
+    with open(args.clip, "rb") as f:
+        audio = f.read()
+
+    result = run_load(
+        lambda http: http.post(
+            f"{url}/speech-to-text", files={"audio": ("clip.webm", audio)}
+        ),
+        concurrency=args.concurrency,
+        duration=args.duration,
+    )
+    print_result(f"/speech-to-text (c={args.concurrency})", result)
+
+    admin = requests.Session()  # the web app keeps the token in its session cookie
+    admin.post(f"{url}/login", data={"username": args.user, "password": args.password})
+    response = admin.get(f"{url}/speech-to-text/stats")
+    response.raise_for_status()
+    stats = response.json()
+    print(
+        f"{'whisper pool':<32} {stats['model']} x{stats['instances']}   "
+        f"latency avg {stats['latency_ms_avg']} ms   p95 {stats['latency_ms_p95']} ms   "
+        f"queue wait p95 {stats['wait_ms_p95']} ms   avg batch {stats['avg_batch_size']}"
+    )
+    print(f"{'rejected / timeouts':<32} {stats['rejected']} / {stats['timeouts']}")
+    print(f"{'batch fallbacks':<32} {stats['fallbacks']}")
+
+
+if __name__ == "__main__":
+    main()
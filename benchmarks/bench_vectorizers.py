@@ -0,0 +1,118 @@
+"""
+TF-IDF vs. hashed (HashingVectorizer + IDF) model: accuracy, artifact
+size, load time, transform latency and memory, for both the pickled and
+the memory-mapped format.
+
+    python benchmarks/bench_vectorizers.py                          # generates Training_data.csv
+    python benchmarks/bench_vectorizers.py --data Training_data.csv --n-features 65536
+
+Each variant/format is loaded in a fresh process so import and load costs
+are measured cold.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai_intratation import train  # noqa: E402
+
+WORKER = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+
+def rss_kb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+fmt, model_dir = sys.argv[1], sys.argv[2]
+texts = json.loads(sys.stdin.read())
+before = rss_kb()
+start = time.perf_counter()
+if fmt == "mmap":
+    from ai_intratation.artifacts import load_mapped
+    model, vectorizer = load_mapped(os.path.join(model_dir, "mmap"))
+else:
+    from joblib import load
+    model = load(os.path.join(model_dir, "model.pkl"))
+    vectorizer = load(os.path.join(model_dir, "vectorizer.pkl"))
+load_s = time.perf_counter() - start
+
+model.predict(vectorizer.transform(texts[:10]))  # warm up
+single = []
+for text in texts[:2000]:
+    t = time.perf_counter()
+    vectorizer.transform([text])
+    single.append(time.perf_counter() - t)
+single.sort()
+
+t = time.perf_counter()
+X = vectorizer.transform(texts[:1000])
+batch_s = time.perf_counter() - t
+model.predict(X)
+print(json.dumps({{
+    "load_s": load_s,
+    "single_us_p50": single[len(single) // 2] * 1e6,
+    "batch_1000_ms": batch_s * 1000,
+    "rss_mb": (rss_kb() - before) / 1024,
+}}))
+"""
+
+
+def dir_size_mb(path, skip=()):
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        if os.path.basename(dirpath) in skip:
+            continue
+        total += sum(os.path.getsize(os.path.join(dirpath, f)) for f in files)
+    return total / (1024 * 1024)
+
+
+def run_worker(fmt, model_dir, texts):
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER.format(root=ROOT), fmt, model_dir],
+        input=json.dumps(texts), capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", help="training CSV (default: generate one)")
+    parser.add_argument("--n-features", type=int, default=train.HASH_FEATURES)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = args.data
+        if not data:
+            subprocess.run([sys.executable, os.path.join(ROOT, "ai_intratation", "data_generator.py")],
+                           cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+            data = os.path.join(tmp, "Training_data.csv")
+
+        texts, labels = train.load_training_data(data)
+        probe = texts[::max(1, len(texts) // 2000)][:2000]
+
+        print(f"{'variant':<8} {'format':<7} {'features':>9} {'accuracy':>9} {'disk MB':>8} "
+              f"{'load s':>7} {'1 text us':>10} {'1000 ms':>8} {'RSS MB':>7}")
+        for kind in ("tfidf", "hashed"):
+            model, vectorizer, metrics = train.train(texts, labels, kind, args.n_features)
+            out = os.path.join(tmp, kind)
+            train.save(model, vectorizer, metrics, out)
+
+            for fmt in ("pickle", "mmap"):
+                r = run_worker(fmt, out, probe)
+                size = dir_size_mb(os.path.join(out, "mmap")) if fmt == "mmap" \
+                    else dir_size_mb(out, skip=("mmap",))
+                print(f"{kind:<8} {fmt:<7} {metrics['n_features']:>9} {metrics['accuracy']:>9.4f} "
+                      f"{size:>8.2f} {r['load_s']:>7.3f} {r['single_us_p50']:>10.1f} "
+                      f"{r['batch_1000_ms']:>8.2f} {r['rss_mb']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
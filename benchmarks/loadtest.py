@@ -0,0 +1,72 @@
+"""
+Small threaded HTTP load generator shared by the API benchmarks.
+
+Each worker thread owns a keep-alive requests.Session and calls
+send(session) in a loop until the duration runs out.
+"""
+import os
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ai_intratation.stats import percentile  # noqa: E402,F401  (re-exported for the benchmarks)
+
+
+def run_load(send, concurrency=16, duration=10.0):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        http = requests.Session()
+        local, local_errors = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = send(http)
+                ok = response.status_code < 400
+            except requests.RequestException:
+                ok = False
+            if ok:
+                local.append((time.perf_counter() - start) * 1000)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+    }
+
+
+def print_result(name, result):
+    print(
+        f"{name:<32} {result['rps']:9.1f} req/s   "
+        f"p50 {result['p50_ms']:7.2f} ms   p99 {result['p99_ms']:7.2f} ms   "
+        f"errors {result['errors']}"
+    )
+
+
+def login(url, username, password):
+    response = requests.post(
+        f"{url}/login", data={"username": username, "password": password}
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
@@ -1,11 +1,12 @@
+import csv
 import random
-import pandas as pd
+import sys
 from datetime import datetime, timedelta
 
 # ==================================================
 # ⚙️ SETTINGS (CHANGE ONLY HERE)
 # ==================================================
-TOTAL_ROWS = 200          # 👈 change dataset size here
+TOTAL_ROWS = 200          # 👈 change dataset size here (or pass it as argv[1])
 OUTPUT_FILE = "Sample_data.csv"
 
 START_DATE = datetime(2024, 1, 1)
@@ -95,33 +96,45 @@ def random_date():
 # =========================
 # Data Generation
 # =========================
-data = []
-categories = list(templates.keys())
+def generate_rows(total_rows=TOTAL_ROWS):
+    """Yield [ID, Description, Amount, Category, Date] rows one at a time."""
+    categories = list(templates.keys())
 
-for i in range(1, TOTAL_ROWS + 1):
+    for i in range(1, total_rows + 1):
 
-    category = random.choice(categories)
-    template = random.choice(templates[category])
+        category = random.choice(categories)
+        template = random.choice(templates[category])
 
-    description = template.format(**{
-        k: random.choice(v) for k, v in fillers.items()
-    })
+        description = template.format(**{
+            k: random.choice(v) for k, v in fillers.items()
+        })
 
-    amount = random.randint(MIN_AMOUNT, MAX_AMOUNT)
-    date = random_date()
+        amount = random.randint(MIN_AMOUNT, MAX_AMOUNT)
+        date = random_date()
 
-    data.append([i, description, amount, category, date])
+        yield [i, description, amount, category, date]
 
 
 # =========================
 # Save CSV
 # =========================
-df = pd.DataFrame(
-    data,
-    columns=["ID", "Description", "Amount", "Category", "Date"]
-)
-
-df.to_csv(OUTPUT_FILE, index=False)
-
-print(f"✅ Rows generated: {len(df)}")
-print(f"✅ Saved as: {OUTPUT_FILE}")
\ No newline at end of file
+def write_csv(path=OUTPUT_FILE, total_rows=TOTAL_ROWS):
+    """Stream rows straight to disk, so large files need no extra memory."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Description", "Amount", "Category", "Date"])
+        count = 0
+        for row in generate_rows(total_rows):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else TOTAL_ROWS
+    output = sys.argv[2] if len(sys.argv) > 2 else OUTPUT_FILE
+
+    count = write_csv(output, rows)
+
+    print(f"✅ Rows generated: {count}")
+    print(f"✅ Saved as: {output}")
@@ -2,7 +2,10 @@ import subprocess
 import sys
 import os
 import shutil
+import signal
 import time
+import urllib.error
+import urllib.request
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 VENV_DIR = os.path.join(SCRIPT_DIR, ".venv")
@@ -10,6 +13,16 @@ REQUIREMENTS_FILE = os.path.join(SCRIPT_DIR, "requirements.txt")
 ENV_FILE = os.path.join(SCRIPT_DIR, ".env")
 ENV_EXAMPLE_FILE = os.path.join(SCRIPT_DIR, ".env.example")
 
+API_READY_URL = "http://127.0.0.1:8000/ready"
+WEB_READY_URL = "http://127.0.0.1:5000/ready"
+READY_TIMEOUT = 120  # seconds to wait for each service before giving up
+
+# --prod: gunicorn masters write their PIDs here for --reload
+PID_DIR = os.path.join(SCRIPT_DIR, "run")
+API_PID_FILE = os.path.join(PID_DIR, "api.pid")
+WEB_PID_FILE = os.path.join(PID_DIR, "web.pid")
+GRACEFUL_TIMEOUT = "30"  # seconds a worker gets to finish requests on reload/stop
+
 
 def get_system_python():
     if sys.platform == "win32":
@@ -114,25 +127,135 @@ def setup():
     print()
 
 
-def start_api():
-    print("[API] Starting FastAPI server...")
-    api_process = subprocess.Popen(
-        [get_venv_python(), "-m", "uvicorn", "api.main:app", "--host", "0.0.0.0", "--port", "8000"],
-        cwd=SCRIPT_DIR
+def load_settings():
+    """.env overlaid by the environment, as the services see it; not exported."""
+    from dotenv import dotenv_values  # available once we run inside the venv
+    return {**dotenv_values(ENV_FILE), **os.environ}
+
+
+def worker_settings(settings=None):
+    """Process counts for --prod: from .env / the environment, else sized to the CPUs."""
+    settings = os.environ if settings is None else settings
+    cpus = os.cpu_count() or 1
+    return {
+        # API requests are CPU-bound (model, JSON) around async I/O: one per core
+        "api_workers": int(settings.get("API_WORKERS") or cpus),
+        # the web tier mostly waits on the API: fewer processes, more threads
+        "web_workers": int(settings.get("WEB_WORKERS") or max(2, cpus // 2)),
+        "web_threads": int(settings.get("WEB_THREADS") or 8),
+    }
+
+
+def api_command(production=False, workers=1):
+    python = get_venv_python()
+    if not production:
+        return [python, "-m", "uvicorn", "api.main:app", "--host", "0.0.0.0", "--port", "8000"]
+
+    if sys.platform == "win32":
+        # gunicorn is POSIX-only; uvicorn's own supervisor has no graceful reload
+        return [python, "-m", "uvicorn", "api.main:app", "--host", "0.0.0.0", "--port", "8000",
+                "--workers", str(workers)]
+
+    return [
+        python, "-m", "gunicorn", "api.main:app",
+        "--worker-class", "uvicorn_worker.UvicornWorker",
+        "--workers", str(workers),
+        "--bind", "0.0.0.0:8000",
+        "--graceful-timeout", GRACEFUL_TIMEOUT,
+        "--pid", API_PID_FILE,
+    ]
+
+
+def web_command(production=False, workers=1, threads=1):
+    python = get_venv_python()
+    if not production or sys.platform == "win32":
+        return [python, "web_application/flask_app.py"]
+
+    return [
+        python, "-m", "gunicorn", "flask_app:app",
+        "--chdir", os.path.join(SCRIPT_DIR, "web_application"),
+        "--config", os.path.join(SCRIPT_DIR, "web_application", "gunicorn_conf.py"),
+        "--worker-class", "gthread",
+        "--workers", str(workers),
+        "--threads", str(threads),
+        "--bind", "0.0.0.0:5000",
+        "--graceful-timeout", GRACEFUL_TIMEOUT,
+        "--pid", WEB_PID_FILE,
+    ]
+
+
+def prepare_database():
+    """--prod: migrate (and --reset-db) once, before any worker starts."""
+    print("[API] Preparing database...")
+    subprocess.run(
+        [get_venv_python(), "-c", "from api.main import prepare_database; prepare_database()"],
+        cwd=SCRIPT_DIR, check=True
     )
+    # already done; workers must not wipe the database again one by one
+    os.environ["DB_RESET"] = "false"
+
+
+def reload_services():
+    """
+    Graceful reload: gunicorn starts new workers, which import the current
+    code and read .env again, then lets the old ones finish their requests.
+    Worker counts are command-line options of the master and only change on
+    a full restart.
+    """
+    for name, pid_file in (("API", API_PID_FILE), ("WEB", WEB_PID_FILE)):
+        try:
+            with open(pid_file) as f:
+                pid = int(f.read().strip())
+            os.kill(pid, signal.SIGHUP)
+            print(f"[{name}] Reload signal sent to PID {pid}")
+        except (OSError, ValueError) as e:
+            print(f"[{name}] Not reloaded: {e}")
+
+
+def start_api(production=False, workers=1):
+    print("[API] Starting FastAPI server...")
+    if production:
+        print(f"[API] Production mode: {workers} worker(s)")
+    api_process = subprocess.Popen(api_command(production, workers), cwd=SCRIPT_DIR)
     return api_process
 
 
-def start_web():
+def start_web(production=False, workers=1, threads=1):
     print("[WEB] Starting Flask web application...")
-    web_process = subprocess.Popen(
-        [get_venv_python(), "web_application/flask_app.py"],
-        cwd=SCRIPT_DIR
-    )
+    if production:
+        if sys.platform == "win32":
+            print("[WEB] WARNING: gunicorn is not available on Windows, using the Flask server")
+        else:
+            print(f"[WEB] Production mode: {workers} worker(s) x {threads} thread(s)")
+    web_process = subprocess.Popen(web_command(production, workers, threads), cwd=SCRIPT_DIR)
     return web_process
 
 
+def wait_until_ready(name, url, process, timeout=READY_TIMEOUT):
+    """Poll a /ready endpoint until it answers 200, the process exits or time runs out."""
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        if process.poll() is not None:
+            print(f"[{name}] Process exited with code {process.returncode}")
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    print(f"[{name}] Ready in {time.perf_counter() - start:.1f}s")
+                    return True
+        except (urllib.error.URLError, OSError):
+            pass  # not listening yet, or 503 while warming up
+        time.sleep(0.2)
+
+    print(f"[{name}] WARNING: not ready after {timeout}s, continuing anyway")
+    return False
+
+
 def main():
+    if "--reload" in sys.argv:
+        reload_services()
+        return
+
     print("=" * 50)
     print("  Expense Tracker Application")
     print("=" * 50)
@@ -140,6 +263,20 @@ def main():
 
     setup()
 
+    production = "--prod" in sys.argv
+    settings = os.environ
+    if production:
+        # read, not exported: the workers load .env themselves, so --reload
+        # picks up changes to it (the environment still takes precedence)
+        settings = load_settings()
+        os.makedirs(PID_DIR, exist_ok=True)
+
+    if "--reset-db" in sys.argv:
+        # inherited by the API process; wipes the database once on startup
+        os.environ["DB_RESET"] = "true"
+        print("[SETUP] --reset-db given: the database will be wiped on startup")
+        print()
+
     print("=" * 50)
     print("  Cleaning up ports...")
     print("=" * 50)
@@ -155,9 +292,14 @@ def main():
     print("=" * 50)
     print()
 
-    api_process = start_api()
-    time.sleep(3)  # Wait for API to fully start before launching Flask
-    web_process = start_web()
+    workers = worker_settings(settings)
+    if production:
+        prepare_database()
+
+    api_process = start_api(production, workers["api_workers"])
+    wait_until_ready("API", API_READY_URL, api_process)
+    web_process = start_web(production, workers["web_workers"], workers["web_threads"])
+    wait_until_ready("WEB", WEB_READY_URL, web_process)
 
     print()
     print("=" * 50)
@@ -168,6 +310,8 @@ def main():
     print("=" * 50)
     print()
     print("Press Ctrl+C to stop all services")
+    if production and sys.platform != "win32":
+        print("Run 'python3 start.py --reload' to restart workers on new code and .env")
     print()
 
     try:
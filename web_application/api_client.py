@@ -0,0 +1,93 @@
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# numeric ids and hex/uuid ids such as import job ids
+_ID_SEGMENT = re.compile(r"/(?:\d+|[0-9a-fA-F]{8,}|[0-9a-fA-F-]{36})(?=/|$)")
+
+
+class ApiClient:
+    """
+    Shared keep-alive client for the FastAPI service.
+
+    One pooled requests.Session is reused by every Flask route, so calls
+    reuse TCP connections instead of opening a new one each time. Every
+    call is timed per endpoint; see stats(). Pass route= (e.g.
+    "/jobs/{id}") for paths that embed an id so they share one entry.
+    """
+
+    def __init__(self, base_url, pool_size=20, connect_timeout=3.05,
+                 read_timeout=30, retries=2, backoff=0.2):
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )  # default allowed_methods: idempotent only, so POSTs are never replayed
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, path, token=None, headers=None, route=None, **kwargs):
+        headers = dict(headers or {})
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        start = time.perf_counter()
+        try:
+            return self.session.request(
+                method, f"{self.base_url}{path}", headers=headers, **kwargs
+            )
+        finally:
+            self._record(method, route or path, (time.perf_counter() - start) * 1000)
+
+    def get(self, path, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.request("DELETE", path, **kwargs)
+
+    def _record(self, method, path, elapsed_ms):
+        # "/expenses/12?x=1" -> "/expenses/{id}", "/jobs/af18c9..." -> "/jobs/{id}":
+        # one entry per endpoint, not per id, however long the worker runs
+        endpoint = _ID_SEGMENT.sub("/{id}", path.split("?", 1)[0])
+        key = f"{method} {endpoint}"
+
+        with self._lock:
+            t = self._timings.setdefault(
+                key, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            t["calls"] += 1
+            t["total_ms"] += elapsed_ms
+            t["max_ms"] = max(t["max_ms"], elapsed_ms)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                key: {
+                    "calls": t["calls"],
+                    "avg_ms": round(t["total_ms"] / t["calls"], 3),
+                    "max_ms": round(t["max_ms"], 3),
+                }
+                for key, t in self._timings.items()
+            }
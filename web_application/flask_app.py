@@ -1,11 +1,17 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-import requests
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, Response, stream_with_context
 import os
+import sys
+import threading
 from dotenv import load_dotenv
-from spellchecker import SpellChecker
-import re
-import tempfile
-from collections import defaultdict
+
+# repo root, for the shared ai_intratation helpers (the app runs from web_application/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spelling
+from spelling import SpellCorrector, load_training_vocabulary
+from api_client import ApiClient
+from profile_cache import ProfileCache
+from transcription import TranscriptionBusy, TranscriptionService, TranscriptionTimeout
 
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -18,38 +24,127 @@ app = Flask(__name__, static_folder='static')
 app.secret_key = os.getenv("FLASK_SECRET_KEY")
 FASTAPI_URL = os.getenv("FASTAPI_URL")
 
-try:
-    import whisper
-    whisper_model = whisper.load_model("base")
-except Exception as e:
-    whisper_model = None
-    print(f"Warning: Whisper not loaded: {e}")
+# ---------------- API CLIENT ----------------
+api = ApiClient(
+    FASTAPI_URL,
+    pool_size=int(os.getenv("API_POOL_SIZE", "20")),
+    connect_timeout=float(os.getenv("API_CONNECT_TIMEOUT", "3.05")),
+    read_timeout=float(os.getenv("API_READ_TIMEOUT", "30")),
+    retries=int(os.getenv("API_RETRIES", "2")),
+)
+
+profile_cache = ProfileCache(
+    max_size=int(os.getenv("PROFILE_CACHE_SIZE", "10000")),
+    max_age=int(os.getenv("PROFILE_CACHE_TTL", "300")),
+)
+
+
+def get_profile(token):
+    """Username/role for a session token, or None if the API rejects it."""
+    user = profile_cache.get(token)
+    if user is not None:
+        return user
+
+    response = api.get("/profile", token=token)
+    if response.status_code != 200:
+        return None
+
+    user = response.json()
+    profile_cache.put(token, user)
+    return user
+
+
+def admin_error():
+    """JSON error response unless the session belongs to an admin, else None."""
+    token = session.get("token")
+    if not token:
+        return jsonify({"error": "Not logged in"}), 401
+
+    user = get_profile(token)
+    if not user or user.get("role") != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+    return None
+
+
+# ---------------- SPEECH TO TEXT SERVICE ----------------
+# WHISPER_MODEL: tiny | base | small | medium | large (bigger = slower, better)
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+WHISPER_INSTANCES = int(os.getenv("WHISPER_INSTANCES", "1"))
+WHISPER_QUEUE_SIZE = int(os.getenv("WHISPER_QUEUE_SIZE", "16"))
+WHISPER_TIMEOUT = float(os.getenv("WHISPER_TIMEOUT", "60"))
+WHISPER_BATCH_SIZE = int(os.getenv("WHISPER_BATCH_SIZE", "4"))
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE") or None  # cpu | cuda (default: auto)
+
+# models load in the background once start_warm_up() runs; see /ready
+transcriber = TranscriptionService(
+    model_name=WHISPER_MODEL,
+    instances=WHISPER_INSTANCES,
+    max_queue=WHISPER_QUEUE_SIZE,
+    timeout=WHISPER_TIMEOUT,
+    batch_size=WHISPER_BATCH_SIZE,
+    device=WHISPER_DEVICE,
+)
 
 
 #------------ PROSSING ---------------
-spell = SpellChecker()
-def normalize_text(text: str) -> str:
-    if not text:
-        return ""
+SPELL_CACHE_SIZE = int(os.getenv("SPELL_CACHE_SIZE", "50000"))
+SPELL_USE_SYMSPELL = os.getenv("SPELL_USE_SYMSPELL", "false").lower() == "true"
+SPELL_SYMSPELL_WORDS = int(os.getenv("SPELL_SYMSPELL_WORDS", "30000"))
+
+# How long a request waits for the spell index before skipping correction
+SPELL_WARMUP_WAIT = float(os.getenv("SPELL_WARMUP_WAIT", "10"))
 
-    # trim spaces
-    text = text.strip()
+# Built in the background: the training vocabulary comes from the pickled
+# vectorizer, and unpickling it imports scikit-learn.
+spell_corrector = None
+spell_ready = threading.Event()
 
-    # lowercase
-    text = text.lower()
 
-    # remove weird characters
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
+def build_spell_corrector():
+    global spell_corrector
+    if spell_ready.is_set():
+        return
+    try:
+        spell_corrector = SpellCorrector(
+            cache_size=SPELL_CACHE_SIZE,
+            use_symspell=SPELL_USE_SYMSPELL,
+            symspell_words=SPELL_SYMSPELL_WORDS,
+            vocabulary=load_training_vocabulary()
+        )
+    except Exception as e:
+        print(f"[WARN] Spell corrector not built: {e}")
+    finally:
+        spell_ready.set()
+
 
-    # remove extra spaces
-    text = re.sub(r"\s+", " ", text)
+_warm_up_started = False
 
-    # spelling correction
-    corrected_words = []
-    for word in text.split():
-        corrected_words.append(spell.correction(word) or word)
 
-    return " ".join(corrected_words)
+def start_warm_up():
+    """
+    Start background loading, once; called for every request, so later
+    calls return straight away. Not run at import, so importing the app
+    (e.g. from a script) does not load the spell index and Whisper.
+    """
+    global _warm_up_started
+    if _warm_up_started:
+        return
+    _warm_up_started = True
+
+    if not spell_ready.is_set():
+        threading.Thread(target=build_spell_corrector, name="spell-warm-up", daemon=True).start()
+    transcriber.start()
+
+
+@app.before_request
+def ensure_warm_up():
+    start_warm_up()
+
+
+def normalize_text(text: str) -> str:
+    if not spell_ready.wait(SPELL_WARMUP_WAIT) or spell_corrector is None:
+        return spelling.clean_text(text)
+    return spelling.normalize_text(text, spell_corrector)
 
 
 # ---------------- HOME ----------------
@@ -64,8 +159,8 @@ def login():
         username = request.form["username"]
         password = request.form["password"]
 
-        response = requests.post(
-            f"{FASTAPI_URL}/login",
+        response = api.post(
+            "/login",
             data={
                 "username": username,
                 "password": password
@@ -92,16 +187,11 @@ def dashboard():
         return redirect(url_for("login"))
 
     # Get user profile
-    response = requests.get(
-        f"{FASTAPI_URL}/profile",
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    user = get_profile(token)
 
-    if response.status_code != 200:
+    if user is None:
         return redirect(url_for("login"))
 
-    user = response.json()
-
     prediction = None
     cleaned_text = None
 
@@ -129,10 +219,10 @@ def dashboard():
             cleaned_text = normalize_text(raw_text)
 
             if cleaned_text:
-                pred_response = requests.post(
-                    f"{FASTAPI_URL}/predict",
+                pred_response = api.post(
+                    "/predict",
                     json={"text": cleaned_text},
-                    headers={"Authorization": f"Bearer {token}"}
+                    token=token
                 )
 
                 if pred_response.status_code == 200:
@@ -145,14 +235,14 @@ def dashboard():
             amount = request.form.get("amount")
             category = request.form.get("category")
 
-            requests.post(
-                f"{FASTAPI_URL}/expenses",
+            api.post(
+                "/expenses",
                 json={
                     "description": description,
                     "amount": int(amount),
                     "category": category
                 },
-                headers={"Authorization": f"Bearer {token}"}
+                token=token
             )
 
             return redirect(url_for("expenses_page"))
@@ -172,8 +262,8 @@ def signup():
         username = request.form.get("username")
         password = request.form.get("password")
 
-        response = requests.post(
-            f"{FASTAPI_URL}/signup",
+        response = api.post(
+            "/signup",
             json={
                 "username": username,
                 "password": password
@@ -195,6 +285,9 @@ def signup():
 # ---------------- LOGOUT ----------------
 @app.route("/logout")
 def logout():
+    token = session.get("token")
+    if token:
+        profile_cache.invalidate(token)
     session.clear()
     return redirect(url_for("home"))
 
@@ -205,12 +298,7 @@ def users_page():
     if not token:
         return redirect(url_for("login"))
 
-    response = requests.get(
-        f"{FASTAPI_URL}/users",
-        headers={
-            "Authorization": f"Bearer {token}"
-        }
-    )
+    response = api.get("/users", token=token)
 
     if response.status_code == 403:
         return render_template(
@@ -226,15 +314,13 @@ def users_page():
 
     users = response.json()
     
-    user_response = requests.get(
-        f"{FASTAPI_URL}/profile",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    user = user_response.json() if user_response.status_code == 200 else {}
+    user = get_profile(token) or {}
     
     return render_template("users.html", users=users, user=user)
 
 # ------------ EXPENSES PAGE ---------------
+EXPENSES_PAGE_SIZE = int(os.getenv("EXPENSES_PAGE_SIZE", "50"))
+EXPORT_CHUNK_SIZE = 64 * 1024
 
 @app.route("/expenses")
 def expenses_page():
@@ -243,39 +329,32 @@ def expenses_page():
     if not token:
         return redirect(url_for("login"))
 
-    user_response = requests.get(
-        f"{FASTAPI_URL}/profile",
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    user = get_profile(token)
     
-    if user_response.status_code != 200:
+    if user is None:
         return redirect(url_for("login"))
-    
-    user = user_response.json()
 
-    response = requests.get(
-        f"{FASTAPI_URL}/expenses/recent?limit=1000",
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    response = api.get(f"/expenses/recent?limit={EXPENSES_PAGE_SIZE}", token=token)
 
     if response.status_code != 200:
         return render_template("error.html")
 
     expenses = response.json()
+    next_cursor = response.headers.get("X-Next-Cursor")
 
-    # ---- build chart data ----
-    category_totals = defaultdict(int)
+    # ---- chart data (aggregated by the API) ----
+    summary_response = api.get("/expenses/summary", token=token)
+
+    if summary_response.status_code != 200:
+        return render_template("error.html")
 
-    for e in expenses:
-        category = e.get("category", "Miscellaneous")
-        amount = int(e.get("amount", 0))
-        category_totals[category] += amount
+    summary = summary_response.json()
 
-    chart_labels = list(category_totals.keys())
-    chart_values = list(category_totals.values())
+    chart_labels = [c["category"] for c in summary["categories"]]
+    chart_values = [c["total"] for c in summary["categories"]]
 
     # ⭐ total for donut center
-    total_amount = sum(chart_values)
+    total_amount = summary["total"]
     
     return render_template(
         "expenses.html",
@@ -283,9 +362,34 @@ def expenses_page():
         chart_labels=chart_labels,
         chart_values=chart_values,
         total_amount=total_amount,
+        next_cursor=next_cursor,
+        import_job=request.args.get("job"),
         user=user
     )
 
+
+# ------------ EXPENSES NEXT PAGE (lazy load) ---------------
+@app.route("/expenses/page")
+def expenses_next_page():
+
+    token = session.get("token")
+    if not token:
+        return jsonify({"error": "Not logged in"}), 401
+
+    response = api.get(
+        "/expenses/recent",
+        params={"limit": EXPENSES_PAGE_SIZE, "cursor": request.args.get("cursor")},
+        token=token
+    )
+
+    if response.status_code != 200:
+        return jsonify({"error": "Could not load expenses"}), response.status_code
+
+    return jsonify({
+        "expenses": response.json(),
+        "next_cursor": response.headers.get("X-Next-Cursor")
+    })
+
 # ------------ DELETE EXPENSE ---------------
 @app.route("/expenses/delete/<int:expense_id>", methods=["POST"])
 def delete_expense(expense_id):
@@ -294,64 +398,44 @@ def delete_expense(expense_id):
     if not token:
         return redirect(url_for("login"))
 
-    requests.delete(
-        f"{FASTAPI_URL}/expenses/{expense_id}",
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    api.delete(f"/expenses/{expense_id}", token=token, route="/expenses/{id}")
 
     return redirect(url_for("expenses_page"))
 
 @app.route("/expenses/export")
 def export_expenses():
-    import csv
-    from io import StringIO
-    from flask import Response
-
     token = session.get("token")
     if not token:
         return redirect(url_for("login"))
 
-    # Get expenses from FastAPI
-    response = requests.get(
-        f"{FASTAPI_URL}/expenses/recent?limit=1000",
-        headers={"Authorization": f"Bearer {token}"}
+    compress = request.args.get("gzip", "").lower() in ("1", "true")
+
+    # Stream the CSV from FastAPI chunk-by-chunk instead of buffering it
+    upstream = api.get(
+        "/expenses/export",
+        params={"gzip": "true" if compress else "false"},
+        token=token,
+        stream=True
     )
 
-    if response.status_code != 200:
+    if upstream.status_code != 200:
+        upstream.close()
         return redirect(url_for("expenses_page"))
 
-    expenses = response.json()
-
-    # Create CSV in memory
-    output = StringIO()
-    writer = csv.writer(output)
-
-    # CSV Header
-    writer.writerow([
-        "ID",
-        "Description",
-        "Amount",
-        "Category",
-        "Date"
-    ])
-
-    # CSV Rows
-    for e in expenses:
-        writer.writerow([
-            e["id"],
-            e["description"],
-            e["amount"],
-            e.get("category", ""),
-            e["created_at"]
-        ])
-
-    output.seek(0)
+    def relay():
+        try:
+            for chunk in upstream.iter_content(chunk_size=EXPORT_CHUNK_SIZE):
+                yield chunk
+        finally:
+            upstream.close()
 
     return Response(
-        output,
-        mimetype="text/csv",
+        stream_with_context(relay()),
+        mimetype=upstream.headers.get("Content-Type", "text/csv"),
         headers={
-            "Content-Disposition": "attachment; filename=expenses.csv"
+            "Content-Disposition": upstream.headers.get(
+                "Content-Disposition", "attachment; filename=expenses.csv"
+            )
         },
     )
 
@@ -377,15 +461,31 @@ def import_expenses():
         )
     }
 
-    requests.post(
-        f"{FASTAPI_URL}/expenses/import",
-        files=files,
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    params = {}
+    if request.form.get("auto_categorize"):
+        params["auto_categorize"] = "true"
+
+    response = api.post("/expenses/import", files=files, params=params, token=token)
+
+    if response.status_code == 202:
+        # the import runs in the background; the page polls its progress
+        return redirect(url_for("expenses_page", job=response.json()["job_id"]))
 
     return redirect(url_for("expenses_page"))
 
 
+# -------- IMPORT JOB PROGRESS ----------
+@app.route("/jobs/<job_id>")
+def import_job_status(job_id):
+
+    token = session.get("token")
+    if not token:
+        return jsonify({"error": "Not logged in"}), 401
+
+    response = api.get(f"/jobs/{job_id}", token=token, route="/jobs/{id}")
+    return jsonify(response.json()), response.status_code
+
+
 # -------- DELETE ALL EXPENSES ----------
 @app.route("/expenses/delete-all", methods=["POST"])
 def delete_all_expenses():
@@ -394,46 +494,65 @@ def delete_all_expenses():
     if not token:
         return redirect(url_for("login"))
 
-    requests.delete(
-        f"{FASTAPI_URL}/expenses/delete-all",
-        headers={"Authorization": f"Bearer {token}"}
-    )
+    api.delete("/expenses/delete-all", token=token)
 
     return redirect("/expenses")
 
+# -------- API CLIENT TIMINGS ----------
+@app.route("/api-client/stats")
+def api_client_stats():
+    error = admin_error()
+    if error:
+        return error
+    return jsonify(api.stats())
+
 # -------- SPEECH TO TEXT ----------
 @app.route("/speech-to-text", methods=["POST"])
 def speech_to_text():
-    if whisper_model is None:
+    if transcriber.state == "failed":
         return jsonify({"error": "Speech recognition not available"}), 500
 
     if "audio" not in request.files:
         return jsonify({"error": "No audio file provided"}), 400
 
-    audio_file = request.files["audio"]
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".webm") as tmp:
-        audio_file.save(tmp.name)
-        tmp_path = tmp.name
+    audio_bytes = request.files["audio"].read()  # decoded in memory, no temp file
 
     try:
-        result = whisper_model.transcribe(
-            tmp_path,
-            language="en",
-            task="translate"
-        )
-
-        transcribed_text = result["text"]
-
-        return jsonify({
-            "text": transcribed_text.strip(),
-            "language": "en"
-        })
+        text = transcriber.transcribe(audio_bytes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except TranscriptionBusy:
+        return jsonify({"error": "Speech recognition is busy, try again shortly"}), 429
+    except TranscriptionTimeout:
+        return jsonify({"error": "Speech recognition timed out"}), 504
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        if os.path.exists(tmp_path):
-            os.remove(tmp_path)
+
+    return jsonify({
+        "text": text,
+        "language": "en"
+    })
+
+
+@app.route("/speech-to-text/stats")
+def speech_to_text_stats():
+    error = admin_error()
+    if error:
+        return error
+    return jsonify(transcriber.stats())
+
+
+# -------- READINESS ----------
+@app.route("/ready")
+def ready():
+    # speech-to-text is optional: a failed whisper load does not block readiness
+    components = {
+        "spell_corrector": "ready" if spell_ready.is_set() else "loading",
+        "whisper": transcriber.state,
+    }
+    warm = spell_ready.is_set() and transcriber.state != "loading"
+    return jsonify({"status": "ready" if warm else "starting", **components}), 200 if warm else 503
 
 if __name__ == "__main__":
+    start_warm_up()
     app.run()
\ No newline at end of file
@@ -0,0 +1,12 @@
+# Gunicorn hooks for the web app (python3 start.py --prod).
+# Worker/thread counts and bind address are passed by start.py. The app is
+# not preloaded, so a SIGHUP (start.py --reload) gives new workers that
+# import the current code and .env.
+
+
+def post_worker_init(worker):
+    # start loading the spell index and Whisper in the background of each
+    # worker before its first request, rather than on it
+    import flask_app
+
+    flask_app.start_warm_up()
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+import base64
+import json
+import threading
+import time
+
+
+def token_expiry(token: str):
+    """Read the JWT "exp" claim (epoch seconds) without verifying the token."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+class ProfileCache:
+    """
+    Bounded per-token cache of /profile responses.
+
+    Entries live for at most max_age seconds and never past the token's
+    own expiry, so an expired session is always re-checked by the API.
+    """
+
+    def __init__(self, max_size=10000, max_age=300):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+
+            profile, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[token]
+                return None
+
+            self._data.move_to_end(token)
+            return profile
+
+    def put(self, token, profile):
+        expires_at = time.time() + self.max_age
+        exp = token_expiry(token)
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= time.time() or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._data[token] = (profile, expires_at)
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, token):
+        with self._lock:
+            self._data.pop(token, None)
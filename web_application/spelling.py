@@ -0,0 +1,177 @@
+from functools import lru_cache
+import os
+import re
+import time
+
+from spellchecker import SpellChecker
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+VECTORIZER_PATH = os.path.join(BASE_DIR, "..", "ai_intratation", "model", "vectorizer.pkl")
+MAPPED_VOCAB_PATH = os.path.join(BASE_DIR, "..", "ai_intratation", "model", "mmap", "vocab_terms.npy")
+
+
+# ---------------- HELPERS ----------------
+def clean_text(text: str) -> str:
+    if not text:
+        return ""
+
+    # trim spaces
+    text = text.strip()
+
+    # lowercase
+    text = text.lower()
+
+    # remove weird characters
+    text = re.sub(r"[^a-z0-9\s]", " ", text)
+
+    # remove extra spaces
+    text = re.sub(r"\s+", " ", text)
+
+    return text
+
+
+def load_training_vocabulary(path=VECTORIZER_PATH, mapped_path=MAPPED_VOCAB_PATH) -> set:
+    """Single words the classifier was trained on (bigrams are split)."""
+    try:
+        if os.path.exists(mapped_path):
+            # exported vocabulary: no need to unpickle (and import) scikit-learn
+            import numpy as np
+            terms = [term.decode("utf-8") for term in np.load(mapped_path, mmap_mode="r")]
+        else:
+            from joblib import load
+            terms = load(path).vocabulary_
+    except Exception as e:
+        print(f"[WARN] Training vocabulary not loaded: {e}")
+        return set()
+
+    words = set()
+    for term in terms:
+        words.update(term.split())
+    return words
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    result = set()
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for w in frontier:
+            for i in range(len(w)):
+                next_frontier.add(w[:i] + w[i + 1:])
+        result |= next_frontier
+        frontier = next_frontier
+    return result
+
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Damerau-Levenshtein (optimal string alignment), capped at max_distance + 1."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+# ---------------- SYMSPELL INDEX ----------------
+class SymSpellIndex:
+    """Symmetric-delete lookup: maps every deletion of a dictionary word back to it."""
+
+    def __init__(self, frequencies: dict, max_distance: int = 2):
+        self.max_distance = max_distance
+        self.frequencies = frequencies
+        self.index = {}
+
+        for word in frequencies:
+            for key in _deletes(word, max_distance) | {word}:
+                self.index.setdefault(key, []).append(word)
+
+    def lookup(self, word: str):
+        candidates = set()
+        for key in _deletes(word, self.max_distance) | {word}:
+            candidates.update(self.index.get(key, ()))
+
+        best = None
+        best_rank = None
+        for candidate in candidates:
+            distance = _edit_distance(word, candidate, self.max_distance)
+            if distance > self.max_distance:
+                continue
+            # same ordering as SpellChecker: closest first, then most frequent
+            rank = (distance, -self.frequencies[candidate])
+            if best_rank is None or rank < best_rank:
+                best, best_rank = candidate, rank
+        return best
+
+
+# ---------------- CORRECTOR ----------------
+class SpellCorrector:
+    """
+    Per-word spelling correction with a memo cache.
+
+    Words that are already known (dictionary or training vocabulary) or
+    contain digits are returned as-is; everything else goes through the
+    SymSpell index when one was built, or SpellChecker otherwise.
+    """
+
+    def __init__(self, cache_size=50000, use_symspell=False,
+                 symspell_words=30000, max_distance=2, vocabulary=None):
+        self.spell = SpellChecker(distance=max_distance)
+        self.vocabulary = set(vocabulary or ())
+        self.symspell = None
+
+        if use_symspell:
+            start = time.perf_counter()
+            self.symspell = SymSpellIndex(
+                self._index_frequencies(symspell_words), max_distance
+            )
+            print(
+                f"[INFO] SymSpell index built: {len(self.symspell.index)} keys "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+        self._correct_cached = lru_cache(maxsize=cache_size)(self._correct)
+
+    def _index_frequencies(self, top_n: int) -> dict:
+        dictionary = self.spell.word_frequency.dictionary
+        most_common = sorted(dictionary.items(), key=lambda item: -item[1])[:top_n]
+        frequencies = dict(most_common)
+        for word in self.vocabulary:
+            frequencies[word] = max(frequencies.get(word, 0), dictionary.get(word, 1))
+        return frequencies
+
+    def is_known(self, word: str) -> bool:
+        return word in self.vocabulary or word in self.spell
+
+    def _correct(self, word: str) -> str:
+        if self.is_known(word) or any(c.isdigit() for c in word):
+            return word
+
+        if self.symspell is not None:
+            return self.symspell.lookup(word) or word
+
+        return self.spell.correction(word) or word
+
+    def correct(self, word: str) -> str:
+        return self._correct_cached(word)
+
+    def cache_info(self):
+        return self._correct_cached.cache_info()
+
+
+def normalize_text(text: str, corrector: SpellCorrector) -> str:
+    text = clean_text(text)
+
+    # spelling correction
+    return " ".join(corrector.correct(word) for word in text.split())
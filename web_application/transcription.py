@@ -0,0 +1,284 @@
+from collections import deque
+import queue
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from ai_intratation.stats import percentile
+
+SAMPLE_RATE = 16000
+CLIP_SECONDS = 30  # whisper's window; shorter clips are decoded together
+
+# model.transcribe's defaults, applied to batch-decoded clips as well
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
+
+
+class TranscriptionBusy(Exception):
+    """The request queue is full."""
+
+
+class TranscriptionTimeout(Exception):
+    """The clip was not transcribed within the timeout."""
+
+
+def decode_audio(data: bytes, sample_rate=SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode any ffmpeg-readable audio (webm/ogg/wav/...) from memory to mono
+    float32 PCM, piping through ffmpeg's stdin/stdout instead of a temp file.
+    """
+    cmd = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    result = subprocess.run(cmd, input=data, capture_output=True)
+    if result.returncode != 0:
+        raise ValueError(f"Could not decode audio: {result.stderr.decode(errors='ignore').strip()}")
+    return np.frombuffer(result.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+class _Job:
+    def __init__(self, audio):
+        self.audio = audio
+        self.submitted = time.perf_counter()
+        self.done = threading.Event()
+        self.cancelled = False
+        self.text = None
+        self.error = None
+
+
+class TranscriptionService:
+    """
+    Pool of whisper models fed from one bounded queue.
+
+    Each worker thread owns its own model instance (a model is not safe to
+    share between threads) and takes up to batch_size queued clips at a
+    time; clips that fit in whisper's 30 s window are decoded as one batch
+    (with model.transcribe's silence and hallucination checks, see
+    _decode_batch), longer ones go through model.transcribe on their own.
+    Every instance holds a full copy of the weights, so size `instances` to
+    the RAM/VRAM available.
+
+    torch/whisper and the models load in a background thread started by
+    start(); clips sent before that finishes wait in the queue (within the
+    timeout). Nothing runs at construction, so importing the web app does
+    not load torch.
+    """
+
+    def __init__(self, model_name="base", instances=1, max_queue=16,
+                 timeout=60, batch_size=4, device=None, language="en", task="translate"):
+        self.model_name = model_name
+        self.instances = max(1, instances)
+        self.device = device
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self.language = language
+        self.task = task
+
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._busy_workers = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._fallbacks = 0  # batch results re-run through model.transcribe
+        self._latency_ms = deque(maxlen=1000)   # submit -> text, per clip
+        self._wait_ms = deque(maxlen=1000)      # time spent queued, per clip
+        self._batch_sizes = deque(maxlen=1000)
+
+        self.state = "loading"  # loading | ready | failed
+        self.error = None
+        self.load_seconds = None
+        self.models = []
+        self._started = False
+
+    def start(self):
+        """Begin loading the models in the background (once per service)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._load, name="whisper-load", daemon=True).start()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            import torch  # heavy; kept off the import path of the web app
+            import whisper
+
+            self._torch = torch
+            self._whisper = whisper
+            for index in range(self.instances):
+                model = whisper.load_model(self.model_name, device=self.device)
+                self.models.append(model)
+                threading.Thread(
+                    target=self._worker, args=(model,), name=f"whisper-{index}", daemon=True
+                ).start()
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed" if not self.models else "ready"
+            print(f"Warning: Whisper not loaded: {e}")
+            if not self.models:
+                self._fail_queued()
+            return
+
+        self.load_seconds = time.perf_counter() - start
+        self.state = "ready"
+        print(f"[INFO] Whisper '{self.model_name}' loaded x{self.instances} in {self.load_seconds:.2f}s")
+
+    def _fail_queued(self):
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            job.error = RuntimeError("Speech recognition not available")
+            job.done.set()
+
+    # ---------------- CLIENT SIDE ----------------
+    def transcribe(self, audio_bytes: bytes) -> str:
+        """Decode and transcribe one clip, blocking until done or timed out."""
+        if self.state == "failed":
+            raise RuntimeError("Speech recognition not available")
+        self.start()
+
+        job = _Job(decode_audio(audio_bytes))
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise TranscriptionBusy()
+
+        if not job.done.wait(self.timeout):
+            job.cancelled = True  # a worker that picks it up later skips it
+            with self._lock:
+                self._timeouts += 1
+            raise TranscriptionTimeout()
+
+        if job.error is not None:
+            raise job.error
+        return job.text
+
+    # ---------------- WORKER SIDE ----------------
+    def _next_batch(self):
+        jobs = [self._queue.get()]
+        while len(jobs) < self.batch_size:
+            try:
+                jobs.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return [job for job in jobs if not job.cancelled]
+
+    def _worker(self, model):
+        while True:
+            jobs = self._next_batch()
+            if not jobs:
+                continue
+
+            started = time.perf_counter()
+            with self._lock:
+                self._busy_workers += 1
+                self._batch_sizes.append(len(jobs))
+                for job in jobs:
+                    self._wait_ms.append((started - job.submitted) * 1000)
+
+            try:
+                short = [job for job in jobs if len(job.audio) <= CLIP_SECONDS * SAMPLE_RATE]
+                long = [job for job in jobs if len(job.audio) > CLIP_SECONDS * SAMPLE_RATE]
+
+                if short:
+                    try:
+                        self._decode_batch(model, short)
+                    except Exception as e:
+                        for job in short:
+                            job.error = e
+                for job in long:
+                    try:
+                        job.text = self._transcribe_long(model, job.audio)
+                    except Exception as e:
+                        job.error = e
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._busy_workers -= 1
+                    for job in jobs:
+                        if job.error is None:
+                            self._completed += 1
+                            self._latency_ms.append((finished - job.submitted) * 1000)
+                        else:
+                            self._failed += 1
+                for job in jobs:
+                    job.done.set()
+
+    def _decode_batch(self, model, jobs):
+        """
+        One greedy decode for all short clips, then model.transcribe's own
+        checks on each result: clips that look like silence come back empty
+        and clips that look like a hallucination (repetitive or low
+        confidence) are transcribed again one by one with its temperature
+        fallback, so batching never returns text transcribe would not.
+        """
+        whisper = self._whisper
+        mels = [
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(job.audio), n_mels=model.dims.n_mels)
+            for job in jobs
+        ]
+        options = whisper.DecodingOptions(
+            language=self.language,
+            task=self.task,
+            temperature=0.0,
+            without_timestamps=True,
+            fp16=model.device.type == "cuda",
+        )
+        results = whisper.decode(model, self._torch.stack(mels).to(model.device), options)
+        for job, result in zip(jobs, results):
+            low_confidence = result.avg_logprob < LOGPROB_THRESHOLD
+            if result.no_speech_prob > NO_SPEECH_THRESHOLD and low_confidence:
+                job.text = ""
+            elif low_confidence or result.compression_ratio > COMPRESSION_RATIO_THRESHOLD:
+                with self._lock:
+                    self._fallbacks += 1
+                job.text = self._transcribe_long(model, job.audio)
+            else:
+                job.text = result.text.strip()
+
+    def _transcribe_long(self, model, audio):
+        result = model.transcribe(
+            audio,
+            language=self.language,
+            task=self.task,
+            fp16=model.device.type == "cuda",
+        )
+        return result["text"].strip()
+
+    def stats(self) -> dict:
+        with self._lock:
+            latency = list(self._latency_ms)
+            wait = list(self._wait_ms)
+            batches = list(self._batch_sizes)
+            return {
+                "model": self.model_name,
+                "state": self.state,
+                "load_seconds": self.load_seconds,
+                "instances": len(self.models),
+                "busy_instances": self._busy_workers,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "fallbacks": self._fallbacks,
+                "latency_ms_avg": round(sum(latency) / len(latency), 1) if latency else 0.0,
+                "latency_ms_p95": round(percentile(latency, 95), 1),
+                "wait_ms_p95": round(percentile(wait, 95), 1),
+                "avg_batch_size": round(sum(batches) / len(batches), 2) if batches else 0.0,
+            }